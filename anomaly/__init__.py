@@ -0,0 +1,3 @@
+from anomaly import Anomaly
+
+__all__ = ["Anomaly"]
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Climatology and anomaly stage for ETL.
+
+Runs after Transform:
+- Folds each new Sentinel-2 index scene into per-pixel climatologies
+- Folds each ERA5 temperature summary into per-AOI climatologies
+- Emits anomalies against the baseline as it stood before the new scene
+"""
+
+import os
+import re
+import numpy as np
+import geopandas as gpd
+from ..utils.config import PROCESSED_DATA_DIR
+from ..utils.logging import setup_logger
+from ..utils.governor import get_governor, estimate_bytes
+from ..transform.gridcache import aoi_hash
+from .climatology import ClimatologyStore, grid_key
+
+
+_SCENE_DATE_RE = re.compile(r"_(\d{8})T\d{6}_")
+# Scene-sized float64 arrays alive while one index is processed: values,
+# baseline count/mean/std, and the masking/Welford temporaries
+ANOMALY_ARRAYS = 8
+
+
+class Anomaly:
+    """
+    Anomaly stage for ETL pipeline.
+
+    Methods
+    -------
+    sentinel2_anomalies(indices, profile, scene):
+        Per-pixel index anomalies and climatology update.
+    temperature_anomalies(stats, aoi, day, scene_id):
+        Per-AOI temperature anomalies and climatology update.
+    daily_temperature_anomalies(daily, aoi):
+        Temperature anomalies for every day of ``Transform.temperature_daily``.
+    """
+
+    def __init__(self, period: str = "month", min_count: int = 3, store_dir: str = None):
+        self.logger = setup_logger("anomaly")
+        self.min_count = min_count
+        self.store = ClimatologyStore(store_dir or os.path.join(PROCESSED_DATA_DIR, "climatology"), period)
+        self.governor = get_governor()
+
+    def _anomaly(self, key: str, name: str, day, values, scene_id: str):
+        """Anomaly of ``values`` against the current baseline, then fold it in."""
+        values = np.asarray(values, dtype=np.float64)
+        anomaly = np.full(values.shape, np.nan)
+        seen = self.store.seen(key, f"{scene_id}:{name}")
+
+        base = self.store.baseline(key, name, day)
+        if base is not None:
+            count, mean, _ = base
+            if seen:
+                # Rerun of a scene already in the baseline: take it back out
+                valid = np.isfinite(values)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    mean = np.where(valid, (mean * count - np.where(valid, values, 0)) / (count - 1), mean)
+                count = count - valid
+            ready = count >= self.min_count
+            anomaly[ready] = values[ready] - mean[ready]
+
+        if not seen:
+            self.store.update(key, name, day, values)
+            self.store.mark_seen(key, f"{scene_id}:{name}")
+        return anomaly
+
+    # ------------------------------------------------------------------
+    # SENTINEL-2 ANOMALIES
+    # ------------------------------------------------------------------
+    def sentinel2_anomalies(self, indices: dict, profile: dict, scene: str, charge_outputs: bool = False):
+        """
+        Compute per-pixel index anomalies and update the climatology.
+
+        Parameters
+        ----------
+        indices : dict
+            Index arrays from ``Transform.transform_sentinel2``.
+        profile : dict
+            Output grid from ``Transform.profile``.
+        scene : str
+            Product name or folder, used for the acquisition date and to
+            avoid folding the same scene in twice.
+        charge_outputs : bool
+            Keep the anomaly arrays charged to the memory governor after
+            returning, as in ``Transform.transform_sentinel2``; the caller
+            must then release ``array_bytes(anomalies)``.
+
+        Returns
+        -------
+        dict or None
+            float32 anomaly arrays (NaN where fewer than ``min_count`` past
+            scenes).
+        """
+        self.logger.info("Computing Sentinel-2 index anomalies...")
+
+        if not indices or not profile or not scene:
+            self.logger.warning("No Sentinel-2 indices for anomalies. Skipping.")
+            return None
+
+        match = _SCENE_DATE_RE.search(os.path.basename(scene.rstrip("/")))
+        if not match:
+            self.logger.warning(f"No acquisition date in {scene}. Skipping anomalies.")
+            return None
+        day = f"{match.group(1)[:4]}-{match.group(1)[4:6]}-{match.group(1)[6:]}"
+
+        key = grid_key(profile)
+        scene_id = os.path.basename(scene.rstrip("/"))
+
+        # One admission for the outputs plus the per-index working set
+        shape = (profile["height"], profile["width"])
+        out_bytes = estimate_bytes(shape, np.float32, bands=len(indices))
+        reserved = out_bytes + estimate_bytes(shape, np.float64, bands=ANOMALY_ARRAYS)
+        self.governor.acquire(reserved)
+        try:
+            anomalies = {
+                name: self._anomaly(key, name, day, arr, scene_id).astype(np.float32)
+                for name, arr in indices.items()
+            }
+        except BaseException:
+            self.governor.release(reserved)
+            raise
+        if charge_outputs:
+            self.governor.release(reserved - out_bytes)
+            self.governor.detach(out_bytes)
+        else:
+            self.governor.release(reserved)
+
+        self.logger.info("✅ Sentinel-2 anomalies computed successfully")
+        return anomalies
+
+    # ------------------------------------------------------------------
+    # TEMPERATURE ANOMALIES
+    # ------------------------------------------------------------------
+    def temperature_anomalies(self, stats: dict, aoi: gpd.GeoDataFrame, day, scene_id: str):
+        """
+        Compute per-AOI temperature anomalies and update the climatology.
+
+        Parameters
+        ----------
+        stats : dict
+            Temperature statistics from ``Transform.transform_temperature``.
+        aoi : geopandas.GeoDataFrame
+            AOI the statistics were computed over.
+        day : datetime.date or str
+            Date the statistics refer to.
+        scene_id : str
+            Identifier of the ERA5 cube/date, to avoid double counting.
+
+        Returns
+        -------
+        dict or None
+            Anomaly per statistic (NaN until ``min_count`` past values).
+        """
+        self.logger.info("Computing temperature anomalies...")
+
+        if not stats:
+            self.logger.warning("No temperature stats for anomalies. Skipping.")
+            return None
+
+        anomalies = self._temperature_anomaly(f"aoi_{aoi_hash(aoi)}", stats, day, scene_id)
+
+        self.logger.info("✅ Temperature anomalies computed successfully")
+        return anomalies
+
+    def daily_temperature_anomalies(self, daily: dict, aoi: gpd.GeoDataFrame):
+        """
+        Compute temperature anomalies for each day and update the climatology.
+
+        Parameters
+        ----------
+        daily : dict
+            Date -> statistics, from ``Transform.temperature_daily``.
+        aoi : geopandas.GeoDataFrame
+            AOI the statistics were computed over.
+
+        Returns
+        -------
+        dict or None
+            Date -> anomaly per statistic.
+        """
+        self.logger.info("Computing daily temperature anomalies...")
+
+        if not daily:
+            self.logger.warning("No daily temperature stats for anomalies. Skipping.")
+            return None
+
+        # ERA5 values for a date do not depend on the cube they came in, so
+        # the date alone identifies them in the ledger
+        key = f"aoi_{aoi_hash(aoi)}"
+        anomalies = {day: self._temperature_anomaly(key, stats, day, f"era5_{day}") for day, stats in daily.items()}
+
+        self.logger.info(f"✅ Temperature anomalies computed for {len(anomalies)} days")
+        return anomalies
+
+    def _temperature_anomaly(self, key: str, stats: dict, day, scene_id: str):
+        return {
+            f"{name}_anomaly": float(self._anomaly(key, name, day, np.array([val]), scene_id)[0])
+            for name, val in stats.items()
+        }
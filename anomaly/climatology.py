@@ -0,0 +1,175 @@
+"""
+Incremental on-disk climatology accumulators.
+
+Each (grid, variable, period) slot is a small memory-mapped ``.npy`` file
+holding Welford count/mean/M2 arrays, so a new scene updates the baseline in
+O(pixels) without rereading any history. Slots are independent files, which
+keeps every update to one chunk of the store.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from datetime import datetime
+
+
+def period_index(day, period: str = "month"):
+    """
+    Climatology slot for a date.
+
+    Parameters
+    ----------
+    day : datetime.date or str
+        Acquisition date (ISO string accepted).
+    period : str
+        "month" (1-12) or "doy" (1-366).
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(day, str):
+        day = datetime.fromisoformat(day.replace("Z", "+00:00")).date()
+    if period == "month":
+        return day.month
+    if period == "doy":
+        return day.timetuple().tm_yday
+    raise ValueError(f"Unsupported climatology period: {period}")
+
+
+def grid_key(profile: dict):
+    """Stable key for a raster grid (CRS, transform and shape)."""
+    ident = f"{profile['crs']}|{tuple(profile['transform'])[:6]}|{profile['height']}x{profile['width']}"
+    return hashlib.sha1(ident.encode()).hexdigest()[:16]
+
+
+class ClimatologyStore:
+    """
+    Chunked store of per-pixel (or per-AOI) running statistics.
+
+    Layout: ``<root>/<key>/<variable>/<period>_<slot>.npy`` with shape
+    ``(3, *shape)`` holding count, mean and M2, plus ``<root>/<key>/scenes.txt``
+    listing the scenes already folded in so reruns do not double-count. The
+    ledger is append-only (one ID per line) and read once per key into a set,
+    so checking or recording a scene does not depend on the history length.
+
+    Attributes
+    ----------
+    root : str
+        Store directory.
+    period : str
+        Slot granularity, "month" or "doy".
+    """
+
+    def __init__(self, root: str, period: str = "month"):
+        self.root = root
+        self.period = period
+        self._ledgers = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _slot_path(self, key: str, variable: str, slot: int):
+        return os.path.join(self.root, key, variable.lower(), f"{self.period}_{slot:03d}.npy")
+
+    def _open(self, key: str, variable: str, slot: int, shape):
+        path = self._slot_path(key, variable, slot)
+        if os.path.exists(path):
+            acc = np.load(path, mmap_mode="r+")
+            if acc.shape[1:] != tuple(shape):
+                raise ValueError(f"Climatology grid mismatch for {variable}: {acc.shape[1:]} vs {tuple(shape)}")
+            return acc
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        acc = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(3,) + tuple(shape))
+        acc[:] = 0.0
+        return acc
+
+    # ------------------------------------------------------------------
+    # SCENE LEDGER
+    # ------------------------------------------------------------------
+    def _ledger_path(self, key: str):
+        return os.path.join(self.root, key, "scenes.txt")
+
+    def _ledger(self, key: str):
+        """Set of scene IDs recorded for ``key``, read from disk once."""
+        scenes = self._ledgers.get(key)
+        if scenes is None:
+            scenes = set()
+            path = self._ledger_path(key)
+            if os.path.exists(path):
+                with open(path) as f:
+                    scenes.update(line.rstrip("\n") for line in f if line.strip())
+            legacy = os.path.join(self.root, key, "scenes.json")
+            if os.path.exists(legacy):
+                # Ledger written before it became append-only
+                with open(legacy) as f:
+                    scenes.update(json.load(f))
+            self._ledgers[key] = scenes
+        return scenes
+
+    def seen(self, key: str, scene_id: str):
+        """True if ``scene_id`` was already folded into ``key``."""
+        return bool(scene_id) and scene_id in self._ledger(key)
+
+    def mark_seen(self, key: str, scene_id: str):
+        """Record ``scene_id`` as folded into ``key``."""
+        scenes = self._ledger(key)
+        if not scene_id or scene_id in scenes:
+            return
+        path = self._ledger_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(scene_id + "\n")
+        scenes.add(scene_id)
+
+    # ------------------------------------------------------------------
+    # UPDATE / QUERY
+    # ------------------------------------------------------------------
+    def baseline(self, key: str, variable: str, day):
+        """
+        Current (count, mean, std) arrays for the slot of ``day``.
+
+        Returns
+        -------
+        tuple or None
+            None if no scene has been accumulated for this slot yet.
+        """
+        slot = period_index(day, self.period)
+        path = self._slot_path(key, variable, slot)
+        if not os.path.exists(path):
+            return None
+        count, mean, m2 = np.load(path, mmap_mode="r")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(m2 / (count - 1))
+        return np.array(count), np.array(mean), std
+
+    def update(self, key: str, variable: str, day, values):
+        """
+        Fold one observation per pixel into the slot of ``day`` (Welford).
+
+        NaN pixels leave their accumulators unchanged.
+
+        Parameters
+        ----------
+        key : str
+            Grid or AOI key.
+        variable : str
+            Variable name, e.g. "NDVI".
+        day : datetime.date or str
+            Acquisition date.
+        values : numpy.ndarray
+            Observation array (any shape, fixed per key).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        slot = period_index(day, self.period)
+        acc = self._open(key, variable, slot, values.shape)
+        count, mean, m2 = acc[0], acc[1], acc[2]
+
+        valid = np.isfinite(values)
+        count[valid] += 1
+        delta = np.where(valid, values - mean, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean += np.where(valid, delta / count, 0.0)
+        m2 += np.where(valid, delta * (values - mean), 0.0)
+        acc.flush()
+        del acc
+
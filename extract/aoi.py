@@ -0,0 +1,156 @@
+"""
+Preprocessed AOI cache.
+
+Handles:
+- Normalizing an AOI shapefile ZIP once into GeoParquet, keyed by the ZIP checksum
+- Precomputed EPSG:4326 bounding box
+- Per-CRS projected copies
+- Topology-preserving simplified copies for coarse (e.g. ERA5) masking
+"""
+
+import os
+import json
+import hashlib
+import zipfile
+import geopandas as gpd
+from pyproj import CRS
+
+from .download import DEFAULT_BUFFER_SIZE
+
+
+class AoiCache:
+    """
+    GeoParquet cache of AOI shapefiles.
+
+    Each ZIP gets a directory named after its SHA-256 digest holding the
+    source geometry, a ``meta.json`` with the bbox, and any projected or
+    simplified copies requested so far. The digest itself is memoized by
+    (path, size, mtime) so unchanged ZIPs are not re-hashed either.
+
+    Attributes
+    ----------
+    cache_dir : str
+        Root directory of the cache.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "checksums.json")
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # KEYS
+    # ------------------------------------------------------------------
+    def checksum(self, zip_path: str):
+        """
+        SHA-256 of the ZIP, memoized by path, size and modification time.
+
+        Parameters
+        ----------
+        zip_path : str
+            Path to AOI ZIP file.
+
+        Returns
+        -------
+        str
+            Hex digest.
+        """
+        st = os.stat(zip_path)
+        stamp = f"{os.path.abspath(zip_path)}|{st.st_size}|{st.st_mtime_ns}"
+
+        index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+        if stamp in index:
+            return index[stamp]
+
+        hasher = hashlib.sha256()
+        with open(zip_path, "rb") as f:
+            for chunk in iter(lambda: f.read(DEFAULT_BUFFER_SIZE), b""):
+                hasher.update(chunk)
+        index[stamp] = hasher.hexdigest()
+
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+        return index[stamp]
+
+    # ------------------------------------------------------------------
+    # LOADING
+    # ------------------------------------------------------------------
+    def load(self, zip_path: str, crs=None, simplify: float = None):
+        """
+        Load an AOI, building the cache entry on first use.
+
+        Parameters
+        ----------
+        zip_path : str
+            Path to AOI ZIP file.
+        crs : str or int or pyproj.CRS, optional
+            Target CRS; defaults to the shapefile's own CRS.
+        simplify : float, optional
+            Simplification tolerance in units of ``crs``. Geometries are
+            simplified with ``preserve_topology=True``.
+
+        Returns
+        -------
+        tuple
+            (aoi_gdf, bbox) where bbox = [minx, miny, maxx, maxy] in EPSG:4326.
+        """
+        entry = os.path.join(self.cache_dir, self.checksum(zip_path)[:16])
+        meta_path = os.path.join(entry, "meta.json")
+        if not os.path.exists(meta_path):
+            self._build(zip_path, entry)
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        if crs is None and simplify is None:
+            return gpd.read_parquet(os.path.join(entry, "source.parquet")), meta["bbox"]
+
+        target = CRS.from_user_input(crs or meta["crs"])
+        epsg = target.to_epsg()
+        name = f"epsg{epsg}" if epsg else "crs_" + hashlib.sha1(target.to_wkt().encode()).hexdigest()[:12]
+        if simplify:
+            name += f"_simplified_{simplify:g}"
+        path = os.path.join(entry, f"{name}.parquet")
+        if os.path.exists(path):
+            return gpd.read_parquet(path), meta["bbox"]
+
+        aoi = gpd.read_parquet(os.path.join(entry, "source.parquet")).to_crs(target)
+        if simplify:
+            aoi["geometry"] = aoi.geometry.simplify(simplify, preserve_topology=True)
+        self._write(aoi, path)
+        return aoi, meta["bbox"]
+
+    def _build(self, zip_path: str, entry: str):
+        with zipfile.ZipFile(zip_path) as z:
+            shp_names = sorted(n for n in z.namelist() if n.lower().endswith(".shp"))
+        if not shp_names:
+            raise FileNotFoundError(f"No .shp file found in {zip_path}")
+
+        # GDAL reads straight from the archive; nothing is unpacked to disk
+        aoi = gpd.read_file(f"zip://{os.path.abspath(zip_path)}!{shp_names[0]}")
+        aoi_4326 = aoi.to_crs(epsg=4326)
+
+        os.makedirs(entry, exist_ok=True)
+        self._write(aoi, os.path.join(entry, "source.parquet"))
+        self._write(aoi_4326, os.path.join(entry, "epsg4326.parquet"))
+
+        meta = {
+            "zip": os.path.basename(zip_path),
+            "shapefile": shp_names[0],
+            "crs": aoi.crs.to_string(),
+            "features": len(aoi),
+            "bbox": [float(v) for v in aoi_4326.total_bounds],
+        }
+        # meta.json is written last so a half-built entry is rebuilt next time
+        with open(os.path.join(entry, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=1)
+
+    @staticmethod
+    def _write(aoi, path: str):
+        tmp_path = path + ".tmp"
+        aoi.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
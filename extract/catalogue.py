@@ -0,0 +1,281 @@
+"""
+Local cache of CDSE OData catalogue searches.
+
+Handles:
+- Storing product metadata from previous searches (SQLite)
+- Spatial lookup through an R-tree on product footprints, refined with
+  an exact footprint intersection test
+- Tracking which (bbox, time range) slices have already been searched so
+  only the missing time slices are requested from CDSE
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from shapely import wkt
+from shapely.geometry import box, shape
+from shapely.errors import ShapelyError
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    rowid        INTEGER PRIMARY KEY,
+    id           TEXT UNIQUE NOT NULL,
+    name         TEXT NOT NULL,
+    product_type TEXT,
+    start        TEXT NOT NULL,
+    footprint    TEXT,
+    record       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_time ON products (product_type, start);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_rtree USING rtree (rowid, minx, maxx, miny, maxy);
+
+CREATE TABLE IF NOT EXISTS coverage (
+    rowid        INTEGER PRIMARY KEY,
+    product_type TEXT NOT NULL,
+    t0           TEXT NOT NULL,
+    t1           TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS coverage_rtree USING rtree (rowid, minx, maxx, miny, maxy);
+"""
+
+
+def to_timestamp(value):
+    """
+    Normalize an ISO timestamp (or datetime) to the cache's sortable UTC form.
+
+    Parameters
+    ----------
+    value : str or datetime
+        e.g. "2024-01-01T00:00:00Z" or "2024-01-03T09:35:51.024Z".
+
+    Returns
+    -------
+    str
+        "YYYY-MM-DDTHH:MM:SS.mmmZ"
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def footprint_geometry(product: dict):
+    """
+    Footprint of an OData product as a shapely geometry.
+
+    Parameters
+    ----------
+    product : dict
+        Product entry, using ``GeoFootprint`` (GeoJSON) when present and the
+        ``Footprint`` WKT (e.g. "geography'SRID=4326;POLYGON((...))'")
+        otherwise.
+
+    Returns
+    -------
+    shapely.geometry.base.BaseGeometry or None
+        Footprint in EPSG:4326, or None if no usable footprint is available.
+    """
+    try:
+        geo = product.get("GeoFootprint")
+        if geo and geo.get("coordinates"):
+            geom = shape(geo)
+        elif product.get("Footprint"):
+            geom = wkt.loads(product["Footprint"].split(";", 1)[-1].strip("'"))
+        else:
+            return None
+    except (ValueError, TypeError, ShapelyError):
+        return None
+    return None if geom.is_empty else geom
+
+
+def footprint_bbox(product: dict):
+    """
+    Bounding box of an OData product footprint.
+
+    Returns
+    -------
+    tuple or None
+        (minx, miny, maxx, maxy) or None if no footprint is available.
+    """
+    geom = footprint_geometry(product)
+    return None if geom is None else geom.bounds
+
+
+class CatalogueCache:
+    """
+    SQLite-backed cache of Sentinel-2 catalogue searches.
+
+    Attributes
+    ----------
+    db_path : str
+        Path to the SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(products)")}
+        if "footprint" not in columns:
+            # Cache created before footprints were stored
+            self.conn.execute("ALTER TABLE products ADD COLUMN footprint TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # COVERAGE
+    # ------------------------------------------------------------------
+    def missing_slices(self, bbox, start, end, product_type: str):
+        """
+        Time ranges of a query that no earlier search has covered.
+
+        Only searches whose bbox fully contains ``bbox`` count as coverage,
+        since a smaller earlier search may have missed products.
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            [minx, miny, maxx, maxy] in EPSG:4326.
+        start, end : str
+            ISO time range.
+        product_type : str
+            e.g. "S2MSI2A".
+
+        Returns
+        -------
+        list
+            [(t0, t1), ...] slices still to be fetched, in cache timestamp form.
+        """
+        start, end = to_timestamp(start), to_timestamp(end)
+        rows = self.conn.execute(
+            """
+            SELECT c.t0, c.t1 FROM coverage c JOIN coverage_rtree r ON c.rowid = r.rowid
+            WHERE c.product_type = ? AND r.minx <= ? AND r.maxx >= ? AND r.miny <= ? AND r.maxy >= ?
+              AND c.t1 > ? AND c.t0 < ?
+            ORDER BY c.t0
+            """,
+            (product_type, bbox[0], bbox[2], bbox[1], bbox[3], start, end),
+        ).fetchall()
+
+        missing, cursor = [], start
+        for t0, t1 in rows:
+            if t0 > cursor:
+                missing.append((cursor, min(t0, end)))
+            cursor = max(cursor, t1)
+            if cursor >= end:
+                break
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def record_search(self, bbox, start, end, product_type: str, products):
+        """
+        Store the full result of a CDSE search over one slice.
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            Search bbox.
+        start, end : str
+            Time slice that was searched completely.
+        product_type : str
+            Product type searched.
+        products : list
+            All product records returned for the slice.
+
+        Returns
+        -------
+        list
+            Names of products that were not cached because they carry no
+            footprint. The slice is then not marked as covered, so it is
+            searched again next time instead of silently missing them.
+        """
+        with self.conn:
+            skipped = [p.get("Name", p.get("Id")) for p in products if not self._upsert(p, product_type)]
+            if skipped:
+                return skipped
+            cur = self.conn.execute(
+                "INSERT INTO coverage (product_type, t0, t1) VALUES (?, ?, ?)",
+                (product_type, to_timestamp(start), to_timestamp(end)),
+            )
+            self.conn.execute(
+                "INSERT INTO coverage_rtree VALUES (?, ?, ?, ?, ?)",
+                (cur.lastrowid, bbox[0], bbox[2], bbox[1], bbox[3]),
+            )
+        return []
+
+    def _upsert(self, product: dict, product_type: str):
+        """Insert or refresh one product; False if it has no usable footprint."""
+        geom = footprint_geometry(product)
+        if geom is None:
+            return False
+        bbox = geom.bounds
+        row = self.conn.execute("SELECT rowid FROM products WHERE id = ?", (product["Id"],)).fetchone()
+        record = json.dumps(product)
+        start = to_timestamp(product["ContentDate"]["Start"])
+        if row:
+            self.conn.execute(
+                "UPDATE products SET record = ?, start = ?, footprint = ? WHERE rowid = ?",
+                (record, start, geom.wkt, row[0]),
+            )
+            self.conn.execute(
+                "UPDATE products_rtree SET minx = ?, maxx = ?, miny = ?, maxy = ? WHERE rowid = ?",
+                (bbox[0], bbox[2], bbox[1], bbox[3], row[0]),
+            )
+            return True
+        cur = self.conn.execute(
+            "INSERT INTO products (id, name, product_type, start, footprint, record) VALUES (?, ?, ?, ?, ?, ?)",
+            (product["Id"], product["Name"], product_type, start, geom.wkt, record),
+        )
+        self.conn.execute(
+            "INSERT INTO products_rtree VALUES (?, ?, ?, ?, ?)",
+            (cur.lastrowid, bbox[0], bbox[2], bbox[1], bbox[3]),
+        )
+        return True
+
+    # ------------------------------------------------------------------
+    # LOOKUP
+    # ------------------------------------------------------------------
+    def query(self, bbox, start, end, product_type: str):
+        """
+        Cached products intersecting ``bbox`` with a start time in range.
+
+        The R-tree only compares bounding boxes, so its candidates are
+        checked against the stored footprint (a tile's bbox can overlap the
+        AOI while its footprint, e.g. a partial swath, does not).
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            [minx, miny, maxx, maxy] in EPSG:4326.
+        start, end : str
+            ISO time range.
+        product_type : str
+            Product type.
+
+        Returns
+        -------
+        list
+            Product records ordered by acquisition start.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT p.record, p.footprint FROM products p JOIN products_rtree r ON p.rowid = r.rowid
+            WHERE p.product_type = ? AND p.start >= ? AND p.start < ?
+              AND r.minx <= ? AND r.maxx >= ? AND r.miny <= ? AND r.maxy >= ?
+            ORDER BY p.start
+            """,
+            (product_type, to_timestamp(start), to_timestamp(end), bbox[2], bbox[0], bbox[3], bbox[1]),
+        ).fetchall()
+        area = box(*bbox)
+        products = []
+        for record, footprint in rows:
+            product = json.loads(record)
+            geom = wkt.loads(footprint) if footprint else footprint_geometry(product)
+            if geom is not None and geom.intersects(area):
+                products.append(product)
+        return products
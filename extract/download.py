@@ -0,0 +1,207 @@
+"""
+Streaming download primitive for the extraction stage.
+
+Handles:
+- Large reusable read buffers (no per-chunk Python allocations)
+- File preallocation when the size is known
+- Checksum verification while the data streams in
+- Atomic rename of the finished file
+"""
+
+import os
+import hashlib
+import requests
+
+try:
+    import blake3
+except ImportError:  # optional, only needed for BLAKE3 checksums
+    blake3 = None
+
+
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024  # 8 MiB
+
+
+class ChecksumError(IOError):
+    """Raised when a downloaded file does not match its expected checksum or size."""
+
+
+def new_hasher(algorithm: str):
+    """
+    Return a fresh hash object for the given algorithm name.
+
+    Parameters
+    ----------
+    algorithm : str
+        Hash name as used by CDSE ("MD5", "BLAKE3") or any ``hashlib`` name.
+
+    Returns
+    -------
+    object
+        Object exposing ``update()`` and ``hexdigest()``.
+    """
+    algorithm = algorithm.lower()
+    if algorithm == "blake3":
+        if blake3 is None:
+            raise ValueError("BLAKE3 checksum requested but the 'blake3' package is not installed")
+        return blake3.blake3()
+    return hashlib.new(algorithm)
+
+
+def checksum_from_product(product: dict):
+    """
+    Pick the checksum to verify from a CDSE OData product record.
+
+    BLAKE3 is preferred when the ``blake3`` package is available since it hashes
+    several times faster than MD5; otherwise MD5 is used.
+
+    Parameters
+    ----------
+    product : dict
+        Product entry from the OData ``value`` list.
+
+    Returns
+    -------
+    tuple or None
+        (algorithm, hexdigest) or None if the record carries no usable checksum.
+    """
+    available = {
+        c.get("Algorithm", "").upper(): c.get("Value")
+        for c in product.get("Checksum") or []
+        if c.get("Value")
+    }
+    preferred = ["BLAKE3", "MD5"] if blake3 is not None else ["MD5"]
+    for algorithm in preferred:
+        if algorithm in available:
+            return algorithm, available[algorithm].lower()
+    return None
+
+
+def verify_file(path: str, algorithm: str, expected: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
+    """
+    Hash an existing file and compare it to the expected digest.
+
+    Parameters
+    ----------
+    path : str
+        File to check.
+    algorithm : str
+        Hash algorithm name.
+    expected : str
+        Expected hex digest.
+    buffer_size : int
+        Read buffer size in bytes.
+
+    Returns
+    -------
+    bool
+        True if the digest matches.
+    """
+    hasher = new_hasher(algorithm)
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest().lower() == expected.lower()
+
+
+def _preallocate(fd: int, size: int):
+    """Reserve ``size`` bytes on disk for ``fd`` to limit fragmentation."""
+    if not size:
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # Not supported on this platform / filesystem: fall back to a sparse file
+        os.ftruncate(fd, size)
+
+
+def download_file(url: str, dest: str, headers: dict = None, checksum: tuple = None,
+                  expected_size: int = None, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                  session: requests.Session = None, timeout: int = 300):
+    """
+    Stream ``url`` to ``dest`` with inline checksum verification.
+
+    The body is read with ``readinto`` into a single reusable buffer, hashed as
+    it arrives and written to ``dest + ".part"``. Only when the size and
+    checksum match is the partial file fsynced and atomically renamed to
+    ``dest``; otherwise it is removed and :class:`ChecksumError` is raised.
+
+    Parameters
+    ----------
+    url : str
+        Download URL.
+    dest : str
+        Final file path.
+    headers : dict, optional
+        Extra HTTP headers (e.g. Authorization).
+    checksum : tuple, optional
+        (algorithm, hexdigest) to verify against.
+    expected_size : int, optional
+        Expected size in bytes. Falls back to the Content-Length header.
+    buffer_size : int
+        Read buffer size in bytes.
+    session : requests.Session, optional
+        Session to reuse connections across downloads.
+    timeout : int
+        Request timeout in seconds.
+
+    Returns
+    -------
+    str
+        Path to the verified file.
+    """
+    http = session or requests
+    tmp_path = dest + ".part"
+    hasher = new_hasher(checksum[0]) if checksum else None
+
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    written = 0
+
+    # Checksums and Content-Length refer to the file itself, not a
+    # transfer-compressed body, so ask for it unencoded
+    headers = {"Accept-Encoding": "identity", **(headers or {})}
+
+    try:
+        with http.get(url, headers=headers, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            encoded = r.headers.get("Content-Encoding", "identity").lower() != "identity"
+            if expected_size is None and r.headers.get("Content-Length") and not encoded:
+                expected_size = int(r.headers["Content-Length"])
+            r.raw.decode_content = True
+
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            with os.fdopen(fd, "wb", buffering=0) as f:
+                _preallocate(f.fileno(), expected_size)
+                while True:
+                    n = r.raw.readinto(buf)
+                    if not n:
+                        break
+                    chunk = view[:n]
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    # Raw FileIO may write fewer bytes than asked
+                    done = 0
+                    while done < n:
+                        done += f.write(chunk[done:])
+                    written += n
+                # Trim any preallocated tail left by a short read
+                f.truncate(written)
+                os.fsync(f.fileno())
+
+        if expected_size is not None and written != expected_size:
+            raise ChecksumError(f"Truncated download: got {written} bytes, expected {expected_size}")
+        if hasher is not None and hasher.hexdigest().lower() != checksum[1].lower():
+            raise ChecksumError(f"{checksum[0]} mismatch for {os.path.basename(dest)}")
+
+        os.replace(tmp_path, dest)
+        return dest
+
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,269 @@
+"""
+ERA5 request planning for the WEkEO data access API.
+
+Handles:
+- Snapping and merging overlapping AOI bounding boxes
+- Splitting a date range into per-month jobs (provider size limits)
+- Reusing cubes already downloaded by earlier runs
+"""
+
+import os
+import json
+import hashlib
+import calendar
+from datetime import datetime
+
+ERA5_DATASET_ID = "EO:ECMWF:DAT:REANALYSIS_ERA5_SINGLE_LEVELS"
+ERA5_GRID = 0.25  # native ERA5 single-levels resolution in degrees
+
+MONTH_NAMES = [m.lower() for m in calendar.month_name]
+
+
+def snap_bbox(bbox, grid: float = ERA5_GRID):
+    """
+    Expand a [minx, miny, maxx, maxy] bbox outwards to the ERA5 grid.
+
+    Parameters
+    ----------
+    bbox : list or tuple
+        [minx, miny, maxx, maxy] in EPSG:4326.
+    grid : float
+        Grid spacing in degrees.
+
+    Returns
+    -------
+    tuple
+        Snapped (minx, miny, maxx, maxy).
+    """
+    minx, miny, maxx, maxy = (float(v) for v in bbox)
+    snap_down = lambda v: round((v // grid) * grid, 4)
+    snap_up = lambda v: round(-((-v) // grid) * grid, 4)
+    return snap_down(minx), snap_down(miny), snap_up(maxx), snap_up(maxy)
+
+
+def _intersects(a, b):
+    """True if two bboxes overlap or touch."""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _contains(outer, inner):
+    """True if ``outer`` fully covers ``inner``."""
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+def merge_bboxes(bboxes, grid: float = ERA5_GRID):
+    """
+    Snap bboxes to the ERA5 grid and merge any that overlap or touch.
+
+    Merging repeats until stable, since a merged box can start overlapping a
+    box it did not touch before.
+
+    Parameters
+    ----------
+    bboxes : iterable
+        AOI bounding boxes as [minx, miny, maxx, maxy].
+    grid : float
+        Grid spacing in degrees.
+
+    Returns
+    -------
+    list
+        Merged bboxes as tuples, sorted for a stable job order.
+    """
+    boxes = [snap_bbox(b, grid) for b in bboxes]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for box in boxes:
+            for i, other in enumerate(out):
+                if _intersects(box, other):
+                    out[i] = (min(box[0], other[0]), min(box[1], other[1]),
+                              max(box[2], other[2]), max(box[3], other[3]))
+                    merged = True
+                    break
+            else:
+                out.append(box)
+        boxes = out
+    return sorted(boxes)
+
+
+def split_by_month(start: str, end: str):
+    """
+    Split an ISO date range into (year, month, days) tuples.
+
+    Parameters
+    ----------
+    start, end : str
+        ISO timestamps such as ``START_DATE``/``END_DATE`` (inclusive).
+
+    Returns
+    -------
+    list
+        [(year, month, [day, ...]), ...] with days as ints.
+    """
+    start_d = datetime.fromisoformat(start.replace("Z", "+00:00")).date()
+    end_d = datetime.fromisoformat(end.replace("Z", "+00:00")).date()
+
+    months = []
+    year, month = start_d.year, start_d.month
+    while (year, month) <= (end_d.year, end_d.month):
+        last = calendar.monthrange(year, month)[1]
+        first_day = start_d.day if (year, month) == (start_d.year, start_d.month) else 1
+        last_day = end_d.day if (year, month) == (end_d.year, end_d.month) else last
+        months.append((year, month, list(range(first_day, last_day + 1))))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class Era5Planner:
+    """
+    Turns a date range, variables and AOI bboxes into the minimal set of
+    WEkEO ERA5 jobs, skipping anything already on disk.
+
+    Downloaded cubes are tracked in a JSON manifest next to the files so later
+    runs (or other AOIs) can reuse any cube whose bbox, days, times and
+    variables cover what is requested.
+
+    Attributes
+    ----------
+    cache_dir : str
+        Directory holding downloaded cubes and ``manifest.json``.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.entries = self._read_manifest()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as f:
+            entries = json.load(f)
+        # Drop entries whose files were removed by hand, and entries whose
+        # file was later overwritten by another job (older manifests could
+        # map several jobs to one path; only the last download is on disk)
+        latest = {e["path"]: e for e in entries if os.path.exists(e["path"])}
+        return list(latest.values())
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ------------------------------------------------------------------
+    # PLANNING
+    # ------------------------------------------------------------------
+    def find_cached(self, job: dict):
+        """Return the path of a downloaded cube covering ``job``, or None."""
+        for entry in self.entries:
+            if (entry["year"] == job["year"] and entry["month"] == job["month"]
+                    and _contains(entry["bbox"], job["bbox"])
+                    and set(job["days"]) <= set(entry["days"])
+                    and set(job["times"]) <= set(entry["times"])
+                    and set(job["variables"]) <= set(entry["variables"])):
+                return entry["path"]
+        return None
+
+    def plan(self, start: str, end: str, variables, bboxes, times=("12:00",)):
+        """
+        Build the job list for a request.
+
+        Parameters
+        ----------
+        start, end : str
+            ISO date range (inclusive).
+        variables : list
+            ERA5 variable names, e.g. ["2m_temperature"].
+        bboxes : iterable
+            AOI bounding boxes as [minx, miny, maxx, maxy].
+        times : tuple
+            Hours of day as "HH:MM".
+
+        Returns
+        -------
+        tuple
+            (pending, cached) where ``pending`` is a list of jobs to submit and
+            ``cached`` a list of existing cube paths that already cover the rest.
+        """
+        variables = sorted(set(variables))
+        times = sorted(set(times))
+        pending, cached = [], []
+
+        for bbox in merge_bboxes(bboxes):
+            for year, month, days in split_by_month(start, end):
+                job = {
+                    "bbox": list(bbox),
+                    "year": year,
+                    "month": month,
+                    "days": days,
+                    "times": times,
+                    "variables": variables,
+                }
+                path = self.find_cached(job)
+                if path:
+                    if path not in cached:
+                        cached.append(path)
+                else:
+                    job["path"] = self.cube_path(job)
+                    pending.append(job)
+        return pending, cached
+
+    def cube_path(self, job: dict):
+        """
+        Deterministic file name for a job's cube.
+
+        The exact variables, times and days go into a digest, so jobs that
+        differ only in those never share a file.
+        """
+        minx, miny, maxx, maxy = job["bbox"]
+        content = json.dumps([sorted(job["variables"]), sorted(job["times"]), sorted(job["days"])])
+        digest = hashlib.sha1(content.encode()).hexdigest()[:10]
+        return os.path.join(
+            self.cache_dir,
+            f"ERA5_{job['year']}{job['month']:02d}_{minx:g}_{miny:g}_{maxx:g}_{maxy:g}"
+            f"_{job['days'][0]:02d}-{job['days'][-1]:02d}_{digest}.nc"
+        )
+
+    def record(self, job: dict):
+        """Add a finished job's cube to the manifest."""
+        entry = {k: job[k] for k in ("path", "bbox", "year", "month", "days", "times", "variables")}
+        self.entries = [e for e in self.entries if e["path"] != entry["path"]] + [entry]
+        self._write_manifest()
+
+    # ------------------------------------------------------------------
+    # REQUEST BODY
+    # ------------------------------------------------------------------
+    @staticmethod
+    def job_body(job: dict):
+        """
+        WEkEO data access request body for a planned job.
+
+        Parameters
+        ----------
+        job : dict
+            Job as returned by :meth:`plan`.
+
+        Returns
+        -------
+        dict
+            JSON body for ``POST /dataaccess/jobs``.
+        """
+        minx, miny, maxx, maxy = job["bbox"]
+        return {
+            "datasetId": ERA5_DATASET_ID,
+            "stringChoiceValues": [
+                {"name": "product_type", "value": ["reanalysis"]},
+                {"name": "variable", "value": job["variables"]},
+                {"name": "year", "value": [str(job["year"])]},
+                {"name": "month", "value": [MONTH_NAMES[job["month"]]]},
+                {"name": "day", "value": [f"{d:02d}" for d in job["days"]]},
+                {"name": "time", "value": job["times"]},
+                {"name": "data_format", "value": ["netcdf"]},
+            ],
+            "boundingBoxValues": [{"name": "area", "bbox": [maxy, minx, miny, maxx]}],
+        }
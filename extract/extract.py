@@ -8,10 +8,25 @@ Handles:
 """
 
 import os
+import time
 import zipfile
+import requests
+from datetime import datetime, timezone
+import numpy as np
 import geopandas as gpd
-from ..utils.config import RAW_DATA_DIR, START_DATE, END_DATE
+from .aoi import AoiCache
+from .download import download_file, checksum_from_product, verify_file, DEFAULT_BUFFER_SIZE
+from .era5 import Era5Planner
+from .catalogue import CatalogueCache, to_timestamp
+from .remote import search_items, item_bands, item_tile_id, item_reflectance
+from ..utils.config import RAW_DATA_DIR, START_DATE, END_DATE, STAC_API_URL
 from ..utils.logging import setup_logger
+from ..utils.governor import get_governor
+
+
+CDSE_CATALOGUE_URL = "https://catalogue.dataspace.copernicus.eu/odata/v1/Products"
+CDSE_DOWNLOAD_URL = "https://zipper.dataspace.copernicus.eu/odata/v1/Products"
+WEKEO_JOBS_URL = "https://gateway.prod.wekeo2.eu/hda-broker/api/v1/dataaccess/jobs"
 
 
 class Extract:
@@ -29,19 +44,31 @@ class Extract:
     def __init__(self, cdse_token: str = None, wekeo_token: str = None):
         self.cdse_token = cdse_token
         self.wekeo_token = wekeo_token
+        self.session = requests.Session()
+        self.governor = get_governor()
+        self.aoi_cache = AoiCache(os.path.join(RAW_DATA_DIR, "aoi_cache"))
+        self.catalogue = CatalogueCache(os.path.join(RAW_DATA_DIR, "catalogue.sqlite"))
         self.logger = setup_logger("extract")
 
     # ------------------------------------------------------------------
     # AOI EXTRACTION
     # ------------------------------------------------------------------
-    def get_aoi(self, zip_path: str):
+    def get_aoi(self, zip_path: str, crs=None, simplify: float = None):
         """
-        Extracts an AOI shapefile from a ZIP archive and loads it as GeoDataFrame.
+        Loads an AOI shapefile from a ZIP archive as GeoDataFrame.
+
+        The shapefile is normalized once into the GeoParquet :class:`AoiCache`
+        keyed by the ZIP checksum; later runs read the cached copy directly.
 
         Parameters
         ----------
         zip_path : str
             Path to AOI ZIP file.
+        crs : str or int, optional
+            Return the AOI projected to this CRS (cached per CRS).
+        simplify : float, optional
+            Topology-preserving simplification tolerance in ``crs`` units,
+            e.g. for coarse ERA5 masking.
 
         Returns
         -------
@@ -50,21 +77,25 @@ class Extract:
         """
         self.logger.info("Extracting AOI shapefile...")
 
+        if os.path.exists(zip_path):
+            aoi, bbox = self.aoi_cache.load(zip_path, crs=crs, simplify=simplify)
+            self.logger.info(f"✅ AOI loaded successfully: {os.path.basename(zip_path)} ({len(aoi)} features)")
+            return aoi, bbox
+
+        # No ZIP: fall back to a shapefile already unpacked in the raw directory
         shp_files = []
         for root, _, files in os.walk(RAW_DATA_DIR):
             shp_files.extend([os.path.join(root, f) for f in files if f.endswith(".shp")])
 
-        if not shp_files:
-            with zipfile.ZipFile(zip_path, "r") as z:
-                z.extractall(RAW_DATA_DIR)
-            for root, _, files in os.walk(RAW_DATA_DIR):
-                shp_files.extend([os.path.join(root, f) for f in files if f.endswith(".shp")])
-
         if not shp_files:
             raise FileNotFoundError("No .shp file found in AOI ZIP or raw directory")
 
         aoi = gpd.read_file(shp_files[0])
         bbox = aoi.to_crs(epsg=4326).total_bounds
+        if crs is not None:
+            aoi = aoi.to_crs(crs)
+        if simplify:
+            aoi["geometry"] = aoi.geometry.simplify(simplify, preserve_topology=True)
         self.logger.info(f"✅ AOI extracted successfully: {os.path.basename(shp_files[0])}")
         return aoi, bbox
 
@@ -90,39 +121,248 @@ class Extract:
             return None
 
         self.logger.info("Extracting Sentinel-2 data from CDSE...")
-        # TODO: integrate actual API calls
-        # Placeholder for real API logic
-        product_path = os.path.join(RAW_DATA_DIR, "sentinel2_mock_product")
-        os.makedirs(product_path, exist_ok=True)
-        self.logger.info(f"✅ Sentinel-2 data extracted to {product_path}")
-        return product_path
+
+        try:
+            products = self.search_products(bbox, START_DATE, END_DATE)
+            if not products:
+                self.logger.warning("No Sentinel-2 products found.")
+                return None
+
+            product = products[0]
+            self.logger.info(f"Found product: {product['Name']}")
+            zip_path = self.download_product(product)
+
+            extract_folder = os.path.join(RAW_DATA_DIR, product["Name"])
+            if not os.path.exists(extract_folder):
+                with zipfile.ZipFile(zip_path, "r") as z:
+                    z.extractall(extract_folder)
+
+        except Exception as e:
+            self.logger.warning(f"Sentinel-2 extraction failed: {e}")
+            return None
+
+        self.logger.info(f"✅ Sentinel-2 data extracted to {extract_folder}")
+        return extract_folder
+
+    def get_sentinel2_windows(self, bbox, max_cloud: float = None):
+        """
+        Locates remote Sentinel-2 bands for windowed reads instead of downloading.
+
+        Bands are returned as ``/vsicurl/`` paths to COG/JP2 assets from the
+        STAC API at ``STAC_API_URL``; ``Transform.transform_remote`` then reads
+        only the AOI window over HTTP range requests, so transfer volume
+        scales with the AOI rather than the 110 km tile.
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            [minx, miny, maxx, maxy] of AOI.
+        max_cloud : float, optional
+            Maximum scene cloud cover in percent.
+
+        Returns
+        -------
+        dict or None
+            {"name", "tile_id", "bands", "reflectance"} for the first matching
+            item, or None. ``reflectance`` is (scale, offset) or None.
+        """
+        self.logger.info("Locating remote Sentinel-2 assets via STAC...")
+
+        try:
+            items = search_items(self.session, STAC_API_URL, bbox, START_DATE, END_DATE, max_cloud=max_cloud)
+        except Exception as e:
+            self.logger.warning(f"STAC search failed: {e}")
+            return None
+
+        for item in items:
+            bands = item_bands(item)
+            if bands:
+                product = {
+                    "name": item["properties"].get("s2:product_uri") or item["id"],
+                    "tile_id": item_tile_id(item),
+                    "bands": bands,
+                    "reflectance": item_reflectance(item),
+                }
+                self.logger.info(f"✅ Remote Sentinel-2 item found: {product['name']}")
+                return product
+
+        self.logger.warning("No Sentinel-2 STAC items with the required bands found.")
+        return None
+
+    def search_products(self, bbox, start: str, end: str, product_type: str = "S2MSI2A"):
+        """
+        Search the CDSE catalogue through the local catalogue cache.
+
+        Only time slices not covered by an earlier search of an enclosing
+        bbox are requested from CDSE (all result pages); the answer is then
+        served from the cache.
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            [minx, miny, maxx, maxy] in EPSG:4326.
+        start, end : str
+            ISO time range.
+        product_type : str
+            Sentinel-2 product type.
+
+        Returns
+        -------
+        list
+            Product records ordered by acquisition start.
+        """
+        bbox = [float(v) for v in bbox]
+        # Never mark the future as searched: new acquisitions would be missed
+        end = min(to_timestamp(end), to_timestamp(datetime.now(timezone.utc)))
+
+        for t0, t1 in self.catalogue.missing_slices(bbox, start, end, product_type):
+            self.logger.info(f"Querying CDSE catalogue for {t0} -> {t1}")
+            filter_query = (
+                f"Collection/Name eq 'SENTINEL-2' and "
+                f"Attributes/OData.CSC.StringAttribute/any(att:att/Name eq 'productType' and "
+                f"att/OData.CSC.StringAttribute/Value eq '{product_type}') and "
+                f"OData.CSC.Intersects(area=geography'SRID=4326;POLYGON(({bbox[0]} {bbox[1]},{bbox[2]} {bbox[1]},"
+                f"{bbox[2]} {bbox[3]},{bbox[0]} {bbox[3]},{bbox[0]} {bbox[1]}))') and "
+                f"ContentDate/Start ge {t0} and ContentDate/Start lt {t1}"
+            )
+            url = CDSE_CATALOGUE_URL
+            params = {"$filter": filter_query, "$orderby": "ContentDate/Start asc", "$top": 1000}
+            products = []
+            while url:
+                r = self.session.get(url, params=params, timeout=60)
+                r.raise_for_status()
+                page = r.json()
+                products.extend(page.get("value", []))
+                # nextLink already carries the query string
+                url, params = page.get("@odata.nextLink"), None
+            skipped = self.catalogue.record_search(bbox, t0, t1, product_type, products)
+            if skipped:
+                self.logger.warning(
+                    f"{len(skipped)} product(s) without footprint not cached; {t0} -> {t1} will be searched again: "
+                    + ", ".join(skipped[:5])
+                )
+
+        return self.catalogue.query(bbox, start, end, product_type)
+
+    def download_product(self, product: dict):
+        """
+        Download a CDSE product zip, verifying it against the OData checksum.
+
+        Existing zips are re-hashed before reuse so a truncated file left by an
+        earlier run is caught here rather than during unzip/transform.
+
+        Parameters
+        ----------
+        product : dict
+            Product entry from the OData ``value`` list.
+
+        Returns
+        -------
+        str
+            Path to the verified product zip.
+        """
+        zip_path = os.path.join(RAW_DATA_DIR, f"{product['Name']}.zip")
+        checksum = checksum_from_product(product)
+
+        if os.path.exists(zip_path):
+            if checksum is None or verify_file(zip_path, *checksum):
+                self.logger.info("Product already downloaded")
+                return zip_path
+            self.logger.warning(f"Cached {os.path.basename(zip_path)} failed {checksum[0]} check, re-downloading")
+            os.remove(zip_path)
+
+        if checksum is None:
+            self.logger.warning("No checksum in product record; only the size will be verified")
+
+        url = f"{CDSE_DOWNLOAD_URL}({product['Id']})/$value"
+        headers = {"Authorization": f"Bearer {self.cdse_token}"}
+        self.logger.info(f"Downloading {product['Name']}...")
+        with self.governor.reserve(DEFAULT_BUFFER_SIZE):
+            download_file(url, zip_path, headers=headers, checksum=checksum,
+                          expected_size=product.get("ContentLength"), session=self.session)
+        self.logger.info("✅ Download complete and verified")
+        return zip_path
 
     # ------------------------------------------------------------------
     # TEMPERATURE EXTRACTION
     # ------------------------------------------------------------------
-    def get_temperature(self, bbox):
+    def get_temperature(self, bbox, variables=("2m_temperature",), start: str = START_DATE,
+                        end: str = END_DATE, times=("12:00",)):
         """
-        Downloads ERA5 temperature data for the given bounding box and date range.
+        Downloads ERA5 data for one or more bounding boxes and a date range.
+
+        Requests go through :class:`Era5Planner`, which merges overlapping
+        bboxes, splits the range into monthly jobs and skips cubes that are
+        already on disk. All pending jobs are submitted before any is polled so
+        they queue at WEkEO concurrently.
 
         Parameters
         ----------
         bbox : list or tuple
-            [minx, miny, maxx, maxy] of AOI.
+            [minx, miny, maxx, maxy] of AOI, or a list of such bboxes.
+        variables : tuple
+            ERA5 variable names.
+        start, end : str
+            ISO date range, defaults to ``START_DATE``/``END_DATE``.
+        times : tuple
+            Hours of day as "HH:MM".
 
         Returns
         -------
-        str or None
-            Path to temperature data file, or None if download failed.
+        list or None
+            Paths to the NetCDF cubes covering the request, or None if nothing
+            could be obtained.
         """
         if not self.wekeo_token:
             self.logger.warning("WEkEO token missing. Skipping temperature extraction.")
             return None
 
         self.logger.info("Extracting ERA5 temperature data from WEkEO...")
-        # TODO: integrate actual API call for ERA5 data
-        # Placeholder for real logic
-        temp_file = os.path.join(RAW_DATA_DIR, "era5_mock_temperature.nc")
-        with open(temp_file, "w") as f:
-            f.write("Mock temperature data for demonstration.")
-        self.logger.info(f"✅ ERA5 data extracted to {temp_file}")
-        return temp_file
+        bboxes = [bbox] if isinstance(bbox[0], (int, float, np.number)) else list(bbox)
+
+        planner = Era5Planner(os.path.join(RAW_DATA_DIR, "era5"))
+        pending, paths = planner.plan(start, end, variables, bboxes, times)
+        self.logger.info(f"ERA5 plan: {len(pending)} job(s) to submit, {len(paths)} cube(s) reused")
+
+        headers = {"Authorization": f"Bearer {self.wekeo_token}", "Content-Type": "application/json"}
+        submitted = {}
+        for job in pending:
+            try:
+                r = self.session.post(WEKEO_JOBS_URL, headers=headers, json=planner.job_body(job), timeout=60)
+                r.raise_for_status()
+                job_id = r.json().get("jobId")
+            except Exception as e:
+                self.logger.warning(f"ERA5 job submission failed for {job['year']}-{job['month']:02d}: {e}")
+                continue
+            if job_id:
+                submitted[job_id] = job
+
+        deadline = time.time() + 600  # 10 minutes for the whole batch
+        while submitted and time.time() < deadline:
+            for job_id in list(submitted):
+                try:
+                    r = self.session.get(f"{WEKEO_JOBS_URL}/{job_id}", headers=headers, timeout=60)
+                    status = r.json().get("status", "unknown")
+                    if status == "failed":
+                        self.logger.warning(f"ERA5 job {job_id} failed")
+                        del submitted[job_id]
+                    elif status == "completed":
+                        job = submitted.pop(job_id)
+                        r = self.session.get(f"{WEKEO_JOBS_URL}/{job_id}/result", headers=headers, timeout=60)
+                        with self.governor.reserve(DEFAULT_BUFFER_SIZE):
+                            download_file(r.json()["url"], job["path"], session=self.session)
+                        planner.record(job)
+                        paths.append(job["path"])
+                except Exception as e:
+                    self.logger.warning(f"ERA5 job {job_id} error: {e}")
+                    submitted.pop(job_id, None)
+            if submitted:
+                time.sleep(20)
+
+        if submitted:
+            self.logger.warning(f"{len(submitted)} ERA5 job(s) timed out - continuing with available data")
+
+        if not paths:
+            return None
+        self.logger.info(f"✅ ERA5 data available in {len(paths)} cube(s)")
+        return paths
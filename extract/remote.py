@@ -0,0 +1,136 @@
+"""
+Remote (windowed) Sentinel-2 access through a STAC API.
+
+Handles:
+- STAC item search for a bbox and time range
+- Mapping STAC assets (COG/JP2) to ``/vsicurl/`` band paths
+
+The band paths are opened by ``Transform.read_bands`` like local files;
+since only the AOI window is read, GDAL fetches just the byte ranges of the
+tiles intersecting the AOI instead of the whole product. GDAL settings for
+the range reads are in ``utils.config.REMOTE_GDAL_OPTIONS``.
+"""
+
+import re
+
+# Band name -> asset keys, newest naming first (Earth Search v1, then v0 / CDSE style)
+STAC_BAND_ASSETS = {
+    "B2": ("blue", "B02", "B02_10m"),
+    "B4": ("red", "B04", "B04_10m"),
+    "B5": ("rededge1", "B05", "B05_20m"),
+    "B8": ("nir", "B08", "B08_10m"),
+    "B11": ("swir16", "B11", "B11_20m"),
+}
+
+_TILE_RE = re.compile(r"(\d{2}[A-Z]{3})$")
+
+
+def vsicurl(href: str):
+    """GDAL path for an HTTP(S) asset; local paths are returned unchanged."""
+    if href.startswith(("http://", "https://")):
+        return f"/vsicurl/{href}"
+    if href.startswith("s3://"):
+        return "/vsis3/" + href[len("s3://"):]
+    return href
+
+
+def search_items(session, stac_url: str, bbox, start: str, end: str,
+                 collection: str = "sentinel-2-l2a", max_cloud: float = None, limit: int = 100):
+    """
+    Search a STAC API for items intersecting ``bbox``.
+
+    Parameters
+    ----------
+    session : requests.Session
+        HTTP session.
+    stac_url : str
+        STAC API root, e.g. "https://earth-search.aws.element84.com/v1".
+    bbox : list or tuple
+        [minx, miny, maxx, maxy] in EPSG:4326.
+    start, end : str
+        ISO time range.
+    collection : str
+        STAC collection ID.
+    max_cloud : float, optional
+        Upper bound on ``eo:cloud_cover``.
+    limit : int
+        Page size.
+
+    Returns
+    -------
+    list
+        STAC items ordered by acquisition time.
+    """
+    body = {
+        "collections": [collection],
+        "bbox": [float(v) for v in bbox],
+        "datetime": f"{start}/{end}",
+        "limit": limit,
+        "sortby": [{"field": "properties.datetime", "direction": "asc"}],
+    }
+    if max_cloud is not None:
+        body["query"] = {"eo:cloud_cover": {"lt": max_cloud}}
+
+    items, url, method = [], f"{stac_url.rstrip('/')}/search", "POST"
+    while url:
+        if method == "POST":
+            r = session.post(url, json=body, timeout=60)
+        else:
+            # GET next links carry the whole query (token included) in the URL
+            r = session.get(url, timeout=60)
+        r.raise_for_status()
+        page = r.json()
+        items.extend(page.get("features", []))
+        next_link = next((link for link in page.get("links", []) if link.get("rel") == "next"), None)
+        if next_link is None:
+            break
+        url, method = next_link["href"], next_link.get("method", "GET").upper()
+        if method == "POST" and next_link.get("body"):
+            body = {**body, **next_link["body"]} if next_link.get("merge") else next_link["body"]
+    return sorted(items, key=lambda item: item["properties"].get("datetime", ""))
+
+
+def item_bands(item: dict):
+    """
+    GDAL paths of the required bands of a STAC item.
+
+    Returns
+    -------
+    dict or None
+        Band name -> ``/vsicurl/`` path, or None if a band is missing.
+    """
+    assets = item.get("assets", {})
+    bands = {}
+    for band, keys in STAC_BAND_ASSETS.items():
+        key = next((k for k in keys if k in assets), None)
+        if key is None:
+            return None
+        bands[band] = vsicurl(assets[key]["href"])
+    return bands
+
+
+def item_reflectance(item: dict):
+    """
+    Reflectance (scale, offset) of a STAC item's bands.
+
+    Read from the ``raster:bands`` metadata of the red asset, with
+    reflectance = DN * scale + offset; None if the item does not say.
+    """
+    assets = item.get("assets", {})
+    key = next((k for k in STAC_BAND_ASSETS["B4"] if k in assets), None)
+    raster_bands = assets[key].get("raster:bands") if key else None
+    if not raster_bands or "scale" not in raster_bands[0]:
+        return None
+    return float(raster_bands[0]["scale"]), float(raster_bands[0].get("offset", 0.0))
+
+
+def item_tile_id(item: dict):
+    """MGRS tile ID of a STAC item, e.g. "33NTF"."""
+    props = item.get("properties", {})
+    code = props.get("grid:code") or props.get("s2:mgrs_tile") or ""
+    match = _TILE_RE.search(code.replace("MGRS-", ""))
+    if match:
+        return match.group(1)
+    if all(k in props for k in ("mgrs:utm_zone", "mgrs:latitude_band", "mgrs:grid_square")):
+        return f"{int(props['mgrs:utm_zone']):02d}{props['mgrs:latitude_band']}{props['mgrs:grid_square']}"
+    return None
@@ -0,0 +1,225 @@
+"""
+Chunked ERA5 archive for time-series access.
+
+Handles:
+- Appending downloaded ERA5 cubes into one Zarr store per region and
+  variable set, along time
+- Chunking for long-time / small-area reads
+- Per-AOI time-series queries touching only the needed chunks
+"""
+
+import os
+import glob
+import numpy as np
+import xarray as xr
+import zarr
+from xarray.coding.times import encode_cf_datetime
+
+
+# Long in time, small in space: a multi-year series for an AOI of a few
+# ERA5 cells hits only a handful of chunks.
+TIME_CHUNK = 8760
+SPACE_CHUNK = 8
+ERA5_CELL = 0.25
+
+_DIM_ALIASES = {"valid_time": "time", "lat": "latitude", "lon": "longitude"}
+
+
+def _normalize(ds: xr.Dataset):
+    """Harmonize dimension names and drop per-file auxiliary coordinates."""
+    ds = ds.rename({k: v for k, v in _DIM_ALIASES.items() if k in ds.dims or k in ds.coords})
+    drop = [c for c in ds.coords if c not in ("time", "latitude", "longitude")]
+    return ds.drop_vars(drop).sortby("time")
+
+
+class Era5Archive:
+    """
+    Zarr archive of ERA5 cubes, one store per region bbox.
+
+    Cubes requested for the same (merged, grid-snapped) bbox and with the
+    same variables share a store and are appended along ``time``; times
+    already archived are skipped.
+
+    Attributes
+    ----------
+    root : str
+        Directory holding the ``.zarr`` stores.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def store_path(self, bbox, variables):
+        """Store path for a region bbox [minx, miny, maxx, maxy] and variable set."""
+        minx, miny, maxx, maxy = (float(v) for v in bbox)
+        names = "-".join(sorted(str(v) for v in variables))
+        return os.path.join(self.root, f"era5_{minx:g}_{miny:g}_{maxx:g}_{maxy:g}_{names}.zarr")
+
+    # ------------------------------------------------------------------
+    # APPEND
+    # ------------------------------------------------------------------
+    def append(self, nc_path: str):
+        """
+        Append one downloaded NetCDF cube to its region store.
+
+        Stores are keyed on region and variable set, so every cube appended
+        to a store carries exactly the store's variables. A cube older than
+        the archive is inserted by rewriting only the time chunks from the
+        insertion point on (see :meth:`_insert`).
+
+        Parameters
+        ----------
+        nc_path : str
+            Path to an ERA5 NetCDF file.
+
+        Returns
+        -------
+        tuple
+            (store path, number of new time steps written).
+        """
+        with xr.open_dataset(nc_path) as src:
+            ds = _normalize(src).load()
+
+        lat, lon = ds["latitude"].values, ds["longitude"].values
+        path = self.store_path([lon.min(), lat.min(), lon.max(), lat.max()], ds.data_vars)
+
+        if os.path.exists(path):
+            with xr.open_zarr(path) as existing:
+                archived = existing["time"].values
+                same_grid = (np.array_equal(existing["latitude"].values, lat)
+                             and np.array_equal(existing["longitude"].values, lon))
+                same_vars = set(existing.data_vars) == set(ds.data_vars)
+            if not same_grid:
+                raise ValueError(f"Grid of {os.path.basename(nc_path)} does not match {os.path.basename(path)}")
+            if not same_vars:
+                raise ValueError(f"Variables of {os.path.basename(nc_path)} do not match {os.path.basename(path)}")
+            ds = ds.sel(time=~np.isin(ds["time"].values, archived))
+            if ds.sizes["time"] == 0:
+                return path, 0
+            if ds["time"].values.min() <= archived.max():
+                self._insert(path, archived, ds)
+            else:
+                self._write(ds, path, mode="a")
+        else:
+            self._write(ds, path, mode="w")
+        return path, ds.sizes["time"]
+
+    @staticmethod
+    def first_time(nc_path: str):
+        """Earliest time step of a NetCDF cube (reads coordinates only)."""
+        with xr.open_dataset(nc_path) as src:
+            return _normalize(src)["time"].values.min()
+
+    def _insert(self, path: str, archived, ds: xr.Dataset):
+        """
+        Insert out-of-order time steps, rewriting only the affected chunks.
+
+        The store grows by ``len(ds.time)`` steps, then every time chunk from
+        the one holding the insertion point to the end is rewritten with
+        ``region=`` writes, last chunk first: each merged position reads from
+        the same or an earlier index, so nothing is overwritten before it is
+        read. Only about one chunk of the archive is in memory at a time.
+        The time coordinate is rewritten last.
+        """
+        n_old, n_new = archived.size, ds.sizes["time"]
+        order = np.argsort(np.concatenate([archived, ds["time"].values]), kind="stable")
+        start = int(np.searchsorted(archived, ds["time"].values.min()))
+
+        with xr.open_zarr(path) as existing:
+            def merged(a, b):
+                src = order[a:b]
+                old, new = src[src < n_old], src[src >= n_old] - n_old
+                parts = []
+                if old.size:
+                    parts.append(existing.isel(time=slice(old.min(), old.max() + 1)).load())
+                if new.size:
+                    parts.append(ds.isel(time=slice(new.min(), new.max() + 1)))
+                return xr.concat(parts, dim="time").sortby("time")
+
+            # Grow the store with the last n_new merged steps
+            self._write(merged(n_old, n_old + n_new), path, mode="a")
+
+            # Rewrite [start, n_old) chunk by chunk, from the end backwards
+            first = (start // TIME_CHUNK) * TIME_CHUNK
+            for a in range(first + ((n_old - 1 - first) // TIME_CHUNK) * TIME_CHUNK, first - 1, -TIME_CHUNK):
+                lo, hi = max(a, start), min(a + TIME_CHUNK, n_old)
+                block = merged(lo, hi).drop_vars(["latitude", "longitude"])
+                for var in block.variables.values():
+                    var.encoding = {}
+                block.to_zarr(path, region={"time": slice(lo, hi)})
+            time_encoding = existing["time"].encoding
+
+        # Region writes cannot touch the time index; rewrite that coordinate
+        # (one small 1-D array) directly with the store's own encoding
+        times = np.concatenate([archived, ds["time"].values])[order]
+        encoded, _, _ = encode_cf_datetime(
+            times, time_encoding.get("units"), time_encoding.get("calendar"), time_encoding.get("dtype")
+        )
+        zarr.open_group(path, mode="r+")["time"][:] = encoded
+
+    @staticmethod
+    def _write(ds: xr.Dataset, path: str, mode: str):
+        for var in ds.data_vars.values():
+            var.encoding = {}
+            if mode == "w":
+                chunks = {"time": TIME_CHUNK, "latitude": SPACE_CHUNK, "longitude": SPACE_CHUNK}
+                var.encoding["chunks"] = tuple(
+                    chunks[d] if d == "time" else min(chunks.get(d, n), n) for d, n in zip(var.dims, var.shape)
+                )
+        if mode == "w":
+            ds.to_zarr(path, mode="w")
+        else:
+            ds.to_zarr(path, mode="a", append_dim="time")
+
+    # ------------------------------------------------------------------
+    # QUERY
+    # ------------------------------------------------------------------
+    def find_store(self, bbox, variable: str = None):
+        """Path of a store whose region covers ``bbox`` (and holds ``variable``), or None."""
+        # Store names hold cell-centre extents; cells reach half a cell further
+        pad = ERA5_CELL / 2
+        for path in sorted(glob.glob(os.path.join(self.root, "era5_*.zarr"))):
+            minx, miny, maxx, maxy = (float(v) for v in os.path.basename(path)[5:-5].split("_", 4)[:4])
+            if not (minx - pad <= bbox[0] and miny - pad <= bbox[1]
+                    and maxx + pad >= bbox[2] and maxy + pad >= bbox[3]):
+                continue
+            if variable is not None:
+                with xr.open_zarr(path) as ds:
+                    if variable not in ds.data_vars:
+                        continue
+            return path
+        return None
+
+    def timeseries(self, bbox, variable: str = "t2m", start: str = None, end: str = None):
+        """
+        Area-mean time series of ``variable`` over ``bbox``.
+
+        Parameters
+        ----------
+        bbox : list or tuple
+            [minx, miny, maxx, maxy] in EPSG:4326.
+        variable : str
+            ERA5 variable short name.
+        start, end : str, optional
+            ISO time bounds.
+
+        Returns
+        -------
+        xarray.DataArray or None
+            Series indexed by time, or None if no store covers ``bbox`` with
+            ``variable``.
+        """
+        path = self.find_store(bbox, variable)
+        if path is None:
+            return None
+        with xr.open_zarr(path) as ds:
+            series = ds[variable].sel(time=slice(start and start.rstrip("Z"), end and end.rstrip("Z")))
+            lat = ds["latitude"]
+            lat_slice = slice(bbox[3], bbox[1]) if lat[0] > lat[-1] else slice(bbox[1], bbox[3])
+            da = series.sel(latitude=lat_slice, longitude=slice(bbox[0], bbox[2]))
+            if da.sizes["latitude"] == 0 or da.sizes["longitude"] == 0:
+                # AOI smaller than a grid cell: use the nearest cell
+                return series.sel(latitude=(bbox[1] + bbox[3]) / 2, longitude=(bbox[0] + bbox[2]) / 2,
+                                  method="nearest").load()
+            return da.mean(dim=("latitude", "longitude")).load()
@@ -10,6 +10,9 @@ import numpy as np
 from datetime import datetime
 from ..utils.config import PROCESSED_DATA_DIR
 from ..utils.logging import setup_logger
+from ..utils.governor import get_governor
+from .archive import Era5Archive
+from .writer import WriteBehindWriter
 
 
 class Load:
@@ -18,15 +21,71 @@ class Load:
 
     Methods
     -------
+    submit(fn, *args):
+        Queue a save call on the background writers.
+    flush() / close():
+        Wait for queued writes (and stop the writers on close).
     save_indices(indices):
         Save NDVI, EVI, SOILM arrays to GeoTIFFs.
     save_temperature(stats):
         Save temperature summary to CSV.
+    archive_temperature(temp_files):
+        Append ERA5 cubes to the chunked time-series archive.
+    save_summaries(summaries):
+        Save streaming index statistics and histograms to CSV.
+    save_anomalies(index_anomalies, temp_anomalies):
+        Save anomaly arrays and temperature anomalies.
+    save_zonal_stats(table):
+        Save per-feature zonal statistics to CSV.
     """
 
-    def __init__(self):
+    def __init__(self, max_pending: int = 8, writers: int = 2):
         self.logger = setup_logger("load")
         os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+        self.archive = Era5Archive(os.path.join(PROCESSED_DATA_DIR, "era5_archive"))
+        self.max_pending = max_pending
+        self.writers = writers
+        self.governor = get_governor()
+        self._writer = None
+
+    # ------------------------------------------------------------------
+    # WRITE-BEHIND
+    # ------------------------------------------------------------------
+    def submit(self, fn, *args, reserved: int = 0, **kwargs):
+        """
+        Run a save call on a background writer thread.
+
+        Lets the pipeline hand off finished products (e.g.
+        ``loader.submit(loader.save_indices, indices)``) and move on to the
+        next transform. Blocks when ``max_pending`` writes are queued. The
+        paths ``fn`` returns are fsynced by the writer once it is done.
+
+        Parameters
+        ----------
+        fn : callable
+            Save method or any write callable.
+        *args, **kwargs
+            Passed to ``fn``; must not be modified after submission.
+        reserved : int
+            Governor memory held by the arguments (e.g.
+            ``array_bytes(indices)``), released when the write is done, so
+            queued products count against the budget until they are on disk.
+        """
+        if self._writer is None:
+            self._writer = WriteBehindWriter(self.max_pending, self.writers, self.logger, self.governor)
+        self._writer.submit(fn, *args, reserved=reserved, **kwargs)
+
+    def flush(self):
+        """Barrier: wait until all submitted writes are on disk."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self):
+        """Flush pending writes and stop the writer threads."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self.logger.info("✅ All background writes completed.")
 
     # ------------------------------------------------------------------
     # SAVE VEGETATION INDICES
@@ -39,15 +98,23 @@ class Load:
         ----------
         indices : dict
             Dictionary of numpy arrays for NDVI, EVI, SOILM.
+
+        Returns
+        -------
+        list
+            Written file paths.
         """
         if not indices:
             self.logger.warning("No indices to save.")
-            return
+            return []
 
+        paths = []
         for name, data in indices.items():
             filename = os.path.join(PROCESSED_DATA_DIR, f"{name.lower()}_{datetime.now():%Y%m%d_%H%M%S}.npy")
             np.save(filename, data)
+            paths.append(filename)
             self.logger.info(f"✅ Saved {name} -> {filename}")
+        return paths
 
     # ------------------------------------------------------------------
     # SAVE TEMPERATURE STATS
@@ -60,10 +127,15 @@ class Load:
         ----------
         stats : dict
             Dictionary containing temperature statistics.
+
+        Returns
+        -------
+        str or None
+            Written CSV path.
         """
         if not stats:
             self.logger.warning("No temperature stats to save.")
-            return
+            return None
 
         csv_path = os.path.join(PROCESSED_DATA_DIR, f"temperature_summary_{datetime.now():%Y%m%d_%H%M%S}.csv")
         with open(csv_path, "w", newline="") as f:
@@ -73,11 +145,163 @@ class Load:
                 writer.writerow([key, val])
 
         self.logger.info(f"✅ Temperature summary saved to {csv_path}")
+        return csv_path
+
+    # ------------------------------------------------------------------
+    # ARCHIVE ERA5 CUBES
+    # ------------------------------------------------------------------
+    def archive_temperature(self, temp_files):
+        """
+        Append downloaded ERA5 cubes to the chunked Zarr archive.
+
+        Cubes are appended in time order (``get_temperature`` returns them
+        in completion order), so the archive only needs rewriting when a
+        cube predates what an earlier run archived.
+
+        Parameters
+        ----------
+        temp_files : str or list
+            NetCDF cube path(s) from ``Extract.get_temperature``.
+
+        Returns
+        -------
+        list
+            Store paths that received data.
+        """
+        temp_files = [temp_files] if isinstance(temp_files, str) else list(temp_files or [])
+        if not temp_files:
+            self.logger.warning("No ERA5 cubes to archive.")
+            return []
+
+        stores = set()
+        for path in sorted(temp_files, key=self.archive.first_time):
+            store, added = self.archive.append(path)
+            stores.add(store)
+            self.logger.info(f"✅ Archived {added} time steps from {os.path.basename(path)}")
+        return sorted(stores)
+
+    # ------------------------------------------------------------------
+    # SAVE INDEX SUMMARIES
+    # ------------------------------------------------------------------
+    def save_summaries(self, summaries: dict):
+        """
+        Save streaming index summaries and histograms to CSV.
+
+        The statistics were accumulated during the transform, so the full
+        index arrays are not read again here.
+
+        Parameters
+        ----------
+        summaries : dict
+            Mapping of index name to ``StreamingStats``.
+
+        Returns
+        -------
+        list
+            Written CSV paths.
+        """
+        if not summaries:
+            self.logger.warning("No index summaries to save.")
+            return []
+
+        timestamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+        summary_path = os.path.join(PROCESSED_DATA_DIR, f"index_summary_{timestamp}.csv")
+        with open(summary_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            header = None
+            for name, stats in summaries.items():
+                row = stats.summary()
+                if header is None:
+                    header = list(row)
+                    writer.writerow(["index"] + header)
+                writer.writerow([name] + [row[k] for k in header])
+
+        hist_path = os.path.join(PROCESSED_DATA_DIR, f"index_histogram_{timestamp}.csv")
+        with open(hist_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["index", "bin_start", "bin_end", "count"])
+            for name, stats in summaries.items():
+                counts, edges = stats.histogram()
+                for lo, hi, n in zip(edges[:-1], edges[1:], counts):
+                    writer.writerow([name, f"{lo:.4f}", f"{hi:.4f}", int(n)])
+
+        self.logger.info(f"✅ Index summaries saved to {summary_path}")
+        return [summary_path, hist_path]
+
+    # ------------------------------------------------------------------
+    # SAVE ANOMALIES
+    # ------------------------------------------------------------------
+    def save_anomalies(self, index_anomalies: dict = None, temp_anomalies: dict = None):
+        """
+        Save anomaly rasters and temperature anomalies.
+
+        Parameters
+        ----------
+        index_anomalies : dict, optional
+            Per-pixel anomaly arrays from ``Anomaly.sentinel2_anomalies``.
+        temp_anomalies : dict, optional
+            Date -> per-AOI anomalies, from
+            ``Anomaly.daily_temperature_anomalies``.
+
+        Returns
+        -------
+        list
+            Written file paths.
+        """
+        if not index_anomalies and not temp_anomalies:
+            self.logger.warning("No anomalies to save.")
+            return []
+
+        paths = []
+        timestamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+        for name, data in (index_anomalies or {}).items():
+            filename = os.path.join(PROCESSED_DATA_DIR, f"{name.lower()}_anomaly_{timestamp}.npy")
+            np.save(filename, data.astype(np.float32, copy=False))
+            paths.append(filename)
+            self.logger.info(f"✅ Saved {name} anomaly -> {filename}")
+
+        if temp_anomalies:
+            csv_path = os.path.join(PROCESSED_DATA_DIR, f"temperature_anomaly_{timestamp}.csv")
+            with open(csv_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Date", "Metric", "Value"])
+                for day, values in temp_anomalies.items():
+                    for key, val in values.items():
+                        writer.writerow([day, key, val])
+            paths.append(csv_path)
+            self.logger.info(f"✅ Temperature anomalies saved to {csv_path}")
+        return paths
+
+    # ------------------------------------------------------------------
+    # SAVE ZONAL STATISTICS
+    # ------------------------------------------------------------------
+    def save_zonal_stats(self, table):
+        """
+        Save per-feature zonal statistics to CSV.
+
+        Parameters
+        ----------
+        table : pandas.DataFrame
+            Output of ``Transform.zonal_statistics``.
+
+        Returns
+        -------
+        str or None
+            Written CSV path.
+        """
+        if table is None or table.empty:
+            self.logger.warning("No zonal statistics to save.")
+            return None
+
+        csv_path = os.path.join(PROCESSED_DATA_DIR, f"zonal_stats_{datetime.now():%Y%m%d_%H%M%S}.csv")
+        table.to_csv(csv_path, float_format="%.4f")
+        self.logger.info(f"✅ Zonal statistics for {len(table)} features saved to {csv_path}")
+        return csv_path
 
     # ------------------------------------------------------------------
     # COMBINED LOADER
     # ------------------------------------------------------------------
-    def load_results(self, indices: dict, temp_stats: dict):
+    def load_results(self, indices: dict, temp_stats: dict, summaries: dict = None):
         """
         Save both Sentinel-2 and ERA5 results.
 
@@ -87,8 +311,12 @@ class Load:
             Sentinel-2 computed indices.
         temp_stats : dict
             ERA5 temperature statistics.
+        summaries : dict, optional
+            Streaming index summaries from ``Transform.summaries``.
         """
         self.logger.info("Saving all ETL results...")
         self.save_indices(indices)
         self.save_temperature(temp_stats)
+        if summaries:
+            self.save_summaries(summaries)
         self.logger.info("✅ All ETL results saved successfully.")
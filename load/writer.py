@@ -0,0 +1,155 @@
+"""
+Write-behind queue for the loading stage.
+
+Finished products are handed to background writer threads so output I/O
+overlaps with the next transform. The queue is bounded: ``submit`` blocks
+when it is full, which keeps memory from growing when compute outpaces disk.
+Save callables return the paths they wrote; the writer fsyncs exactly those.
+Products queued with ``reserved=nbytes`` stay charged to the memory governor
+until their task has finished.
+"""
+
+import os
+import queue
+import threading
+
+
+_STOP = object()
+
+
+def fsync_paths(paths):
+    """
+    fsync files (directories recursively) and the directories naming them.
+
+    Parameters
+    ----------
+    paths : str or iterable of str
+        Files or directory trees (e.g. Zarr stores) to make durable.
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else list(paths or [])
+    dirs = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                dirs.add(root)
+                for name in files:
+                    _fsync(os.path.join(root, name), os.O_RDONLY)
+        elif os.path.exists(path):
+            _fsync(path, os.O_RDONLY)
+        dirs.add(os.path.dirname(os.path.abspath(path)))
+    for d in dirs:
+        _fsync(d, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+
+
+def _fsync(path, flags):
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # e.g. directories on platforms that cannot fsync them
+    finally:
+        os.close(fd)
+
+
+class WriteBehindWriter:
+    """
+    Bounded queue of write tasks served by background threads.
+
+    Attributes
+    ----------
+    max_pending : int
+        Maximum number of queued tasks before ``submit`` blocks.
+    workers : int
+        Number of writer threads.
+    governor : MemoryGovernor, optional
+        Governor that ``reserved`` bytes of finished tasks are released to.
+    """
+
+    def __init__(self, max_pending: int = 8, workers: int = 2, logger=None, governor=None):
+        self.max_pending = max_pending
+        self.workers = workers
+        self.logger = logger
+        self.governor = governor
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._errors = []
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"load-writer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    return
+                fn, args, kwargs, reserved = task
+                try:
+                    fsync_paths(fn(*args, **kwargs))
+                finally:
+                    self._release(reserved)
+            except Exception as e:
+                with self._lock:
+                    self._errors.append(e)
+                if self.logger:
+                    self.logger.warning(f"Background write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _release(self, reserved: int):
+        if reserved and self.governor is not None:
+            self.governor.release(reserved)
+
+    def submit(self, fn, *args, reserved: int = 0, **kwargs):
+        """
+        Queue ``fn(*args, **kwargs)`` for a writer thread.
+
+        Whatever path(s) ``fn`` returns are fsynced once it finishes.
+        Blocks while ``max_pending`` tasks are already waiting (backpressure).
+        Arguments must not be modified by the caller after submission.
+
+        ``reserved`` bytes (detached governor memory held by the arguments)
+        are released once the task has finished, successfully or not.
+        """
+        if not self._threads:
+            self._release(reserved)
+            raise RuntimeError("Writer is closed")
+        self._queue.put((fn, args, kwargs, reserved))
+
+    def flush(self):
+        """
+        Wait until every submitted task has finished and its output is on disk.
+
+        Raises
+        ------
+        RuntimeError
+            If any task failed; the first error is chained.
+        """
+        self._queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise RuntimeError(f"{len(errors)} background write(s) failed") from errors[0]
+
+    def close(self):
+        """Flush, then stop the writer threads."""
+        try:
+            self.flush()
+        finally:
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for t in self._threads:
+                t.join()
+            self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
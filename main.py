@@ -2,7 +2,9 @@ from auth import get_token
 from extract import Extract
 from transform import Transform
 from load import Load
+from anomaly import Anomaly
 from utils.config import AOI_ZIP_PATH
+from utils.governor import array_bytes
 
 def run():
     print("="*70)
@@ -16,18 +18,33 @@ def run():
     # Initialize pipeline components
     extractor = Extract(cdse_token, wekeo_token)
     transformer = Transform()
+    anomalies = Anomaly()
     loader = Load()
 
-    # EXTRACT
-    aoi, bbox = extractor.extract_aoi(AOI_ZIP_PATH)
-    sentinel_folder = extractor.extract_sentinel2(bbox)
-    temp_file = extractor.extract_temperature(bbox)
+    try:
+        # EXTRACT
+        aoi, bbox = extractor.extract_aoi(AOI_ZIP_PATH)
+        sentinel_folder = extractor.extract_sentinel2(bbox)
+        temp_file = extractor.extract_temperature(bbox)
 
-    # TRANSFORM
-    indices = transformer.transform_sentinel2(sentinel_folder, aoi)
-    temp_stats = transformer.transform_temperature(temp_file, aoi)
+        # TRANSFORM (finished products are written in the background)
+        indices = transformer.transform_sentinel2(sentinel_folder, aoi, charge_outputs=True)
+        loader.submit(loader.save_indices, indices, reserved=array_bytes(indices))
+        loader.submit(loader.save_summaries, transformer.summaries)
+        loader.submit(loader.save_zonal_stats, transformer.zonal_statistics(indices, aoi))
 
-    # LOAD
-    loader.load_results(indices, temp_stats)
+        temp_stats = transformer.transform_temperature(temp_file, aoi)
+        loader.submit(loader.save_temperature, temp_stats)
+        loader.submit(loader.archive_temperature, temp_file)
+
+        # ANOMALIES
+        index_anomalies = anomalies.sentinel2_anomalies(indices, transformer.profile, sentinel_folder,
+                                                      charge_outputs=True)
+        temp_anomalies = anomalies.daily_temperature_anomalies(transformer.temperature_daily, aoi)
+        loader.submit(loader.save_anomalies, index_anomalies, temp_anomalies,
+                      reserved=array_bytes(index_anomalies))
+    finally:
+        # LOAD: wait for queued writes even if a stage failed
+        loader.close()
 
     print("\n✅ ETL pipeline completed successfully.")
@@ -0,0 +1,259 @@
+"""
+Per-tile cache of AOI crop windows, masks and resampling grids.
+
+Every acquisition of the same MGRS tile shares its geometry, so the AOI
+reprojection, rasterization and 20 m -> 10 m warp setup only need to be
+computed once per (tile ID, reference grid, AOI, source resolution). Later dates read
+the cached window and resample through a vectorized gather.
+"""
+
+import os
+import re
+import hashlib
+import zipfile
+import numpy as np
+from affine import Affine
+from rasterio import features, windows
+
+
+_TILE_RE = re.compile(r"_T(\d{2}[A-Z]{3})_")
+
+
+def tile_id_from_name(name: str):
+    """
+    MGRS tile ID from a Sentinel-2 product or band file name.
+
+    Parameters
+    ----------
+    name : str
+        e.g. "S2A_MSIL2A_20240103T093351_N0510_R136_T33NTF_20240103T120912".
+
+    Returns
+    -------
+    str or None
+        e.g. "33NTF", or None if the name carries no tile ID.
+    """
+    match = _TILE_RE.search(os.path.basename(name) + "_")
+    return match.group(1) if match else None
+
+
+def aoi_hash(aoi):
+    """Stable digest of AOI geometries and CRS."""
+    h = hashlib.sha1(str(aoi.crs).encode())
+    for geom in aoi.geometry:
+        h.update(geom.wkb)
+    return h.hexdigest()[:16]
+
+
+def _bilinear_axis(dst_centers, src_origin, src_step, size):
+    """
+    Per-axis source indices and weights for bilinear resampling.
+
+    Returns ``(i0, i1, w)`` so that ``out = (1 - w) * a[i0] + w * a[i1]``.
+    """
+    pos = (dst_centers - src_origin) / src_step - 0.5
+    pos = np.clip(pos, 0, size - 1)
+    i0 = np.floor(pos).astype(np.intp)
+    i1 = np.minimum(i0 + 1, size - 1)
+    return i0, i1, (pos - i0).astype(np.float32)
+
+
+class TileGrid:
+    """
+    Cached geometry for one (tile, reference grid, AOI, source resolution) key.
+
+    Attributes
+    ----------
+    window : rasterio.windows.Window
+        AOI crop window on the 10 m reference grid.
+    transform : affine.Affine
+        Transform of the cropped reference grid.
+    mask : numpy.ndarray
+        Boolean mask, True inside the AOI.
+    src_window : rasterio.windows.Window
+        Window to read from the source band.
+    rows, cols : tuple
+        (i0, i1, weight) gather arrays relative to ``src_window``; None when
+        the source is on the reference grid and no resampling is needed.
+    """
+
+    def __init__(self, window, transform, mask, src_window, rows=None, cols=None):
+        self.window = window
+        self.transform = transform
+        self.mask = mask
+        self.src_window = src_window
+        self.rows = rows
+        self.cols = cols
+
+    @property
+    def shape(self):
+        return self.mask.shape
+
+    def resample(self, arr):
+        """
+        Resample a block read from ``src_window`` onto the reference crop.
+
+        Parameters
+        ----------
+        arr : numpy.ndarray
+            2-D array read from the source band with ``src_window``.
+
+        Returns
+        -------
+        numpy.ndarray
+            float32 array of ``self.shape``.
+        """
+        arr = arr.astype(np.float32, copy=False)
+        if self.rows is None:
+            return arr
+        r0, r1, wr = self.rows
+        c0, c1, wc = self.cols
+        top = arr[r0]
+        bottom = arr[r1]
+        wc = wc[None, :]
+        top = top[:, c0] * (1 - wc) + top[:, c1] * wc
+        bottom = bottom[:, c0] * (1 - wc) + bottom[:, c1] * wc
+        wr = wr[:, None]
+        return top * (1 - wr) + bottom * wr
+
+    # ------------------------------------------------------------------
+    # PERSISTENCE
+    # ------------------------------------------------------------------
+    def to_arrays(self):
+        out = {
+            "window": np.array([self.window.col_off, self.window.row_off, self.window.width, self.window.height]),
+            "transform": np.array(self.transform[:6]),
+            "mask": self.mask,
+            "src_window": np.array([self.src_window.col_off, self.src_window.row_off,
+                                    self.src_window.width, self.src_window.height]),
+        }
+        if self.rows is not None:
+            for axis, (i0, i1, w) in (("rows", self.rows), ("cols", self.cols)):
+                out[f"{axis}_i0"], out[f"{axis}_i1"], out[f"{axis}_w"] = i0, i1, w
+        return out
+
+    @classmethod
+    def from_arrays(cls, data):
+        rows = cols = None
+        if "rows_i0" in data:
+            rows = (data["rows_i0"], data["rows_i1"], data["rows_w"])
+            cols = (data["cols_i0"], data["cols_i1"], data["cols_w"])
+        return cls(
+            windows.Window(*data["window"].tolist()),
+            Affine(*data["transform"].tolist()),
+            data["mask"],
+            windows.Window(*data["src_window"].tolist()),
+            rows,
+            cols,
+        )
+
+
+class TileGridCache:
+    """
+    In-memory cache of :class:`TileGrid` objects, optionally backed by
+    ``.npz`` files so later runs skip the geometry work too.
+
+    Attributes
+    ----------
+    cache_dir : str or None
+        Directory for persisted grids; None keeps them in memory only.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+        self._grids = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, tile_id, ref, src, aoi, aoi_key: str = None):
+        """
+        Grid for reading ``src`` onto the AOI crop of ``ref``.
+
+        Parameters
+        ----------
+        tile_id : str
+            MGRS tile ID (see :func:`tile_id_from_name`).
+        ref : rasterio.DatasetReader
+            Open 10 m reference band.
+        src : rasterio.DatasetReader
+            Open band to read (may be ``ref`` itself).
+        aoi : geopandas.GeoDataFrame
+            AOI polygons.
+        aoi_key : str, optional
+            Precomputed :func:`aoi_hash` of ``aoi``.
+
+        Returns
+        -------
+        TileGrid
+        """
+        aoi_key = aoi_key or aoi_hash(aoi)
+        resolution = round(src.res[0], 3)
+        # The reference grid itself is part of the key: without a tile ID
+        # (e.g. renamed folders) different tiles would otherwise collide
+        key = (tile_id, ref.crs.to_string(), aoi_key, resolution, tuple(ref.transform)[:6], ref.shape)
+
+        grid = self._grids.get(key)
+        if grid is None:
+            path = self._path(key)
+            grid = self._load(path) if path else None
+            if grid is None:
+                grid = self._build(ref, src, aoi)
+                if path:
+                    self._save(path, grid)
+            self._grids[key] = grid
+        return grid
+
+    @staticmethod
+    def _load(path):
+        """Cached grid at ``path``; None if missing or unreadable (rebuilt)."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return TileGrid.from_arrays(data)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            return None
+
+    @staticmethod
+    def _save(path, grid):
+        # Temp file + rename, so a crash never leaves a truncated .npz
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **grid.to_arrays())
+        os.replace(tmp_path, path)
+
+    def _path(self, key):
+        if not self.cache_dir or not key[0]:
+            return None
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"T{key[0]}_{key[3]:g}m_{digest}.npz")
+
+    def _build(self, ref, src, aoi):
+        shapes = list(aoi.to_crs(ref.crs).geometry)
+
+        # Crop window on the reference grid, as rasterio.mask(crop=True) would
+        window = features.geometry_window(ref, shapes)
+        transform = windows.transform(window, ref.transform)
+        height, width = int(window.height), int(window.width)
+        mask = features.geometry_mask(shapes, (height, width), transform, invert=True)
+
+        if src.res == ref.res and src.transform == ref.transform:
+            return TileGrid(window, transform, mask, window)
+
+        # Pixel centres of the crop in map coordinates
+        xs = transform.c + (np.arange(width) + 0.5) * transform.a
+        ys = transform.f + (np.arange(height) + 0.5) * transform.e
+
+        # Source window covering the crop plus one pixel for interpolation
+        left, top = xs[0] - transform.a, ys[0] - transform.e
+        right, bottom = xs[-1] + transform.a, ys[-1] + transform.e
+        (row_start, row_stop), (col_start, col_stop) = windows.from_bounds(
+            left, bottom, right, top, src.transform).toranges()
+        row_start, col_start = max(int(np.floor(row_start)), 0), max(int(np.floor(col_start)), 0)
+        row_stop, col_stop = min(int(np.ceil(row_stop)), src.height), min(int(np.ceil(col_stop)), src.width)
+        src_window = windows.Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+        src_transform = windows.transform(src_window, src.transform)
+
+        rows = _bilinear_axis(ys, src_transform.f, src_transform.e, int(src_window.height))
+        cols = _bilinear_axis(xs, src_transform.c, src_transform.a, int(src_window.width))
+        return TileGrid(window, transform, mask, src_window, rows, cols)
@@ -0,0 +1,223 @@
+"""
+Single-pass, mergeable summary statistics for index arrays.
+
+Handles:
+- Count, mean, variance, min and max (Chan et al. parallel update)
+- Fixed-bin histograms with under/overflow counts
+- Approximate quantiles from a fine-grained histogram sketch
+
+Blocks are fed in as they are computed so no extra pass over the full
+arrays is needed, and per-worker accumulators combine with ``merge``.
+"""
+
+import numpy as np
+
+
+# Value ranges used for histogram binning (indices on 0-1 reflectance).
+# Values outside the range still count towards mean/min/max exactly and go
+# to separate under/overflow bins, never into the edge bins.
+INDEX_RANGES = {
+    "NDVI": (-1.0, 1.0),
+    "EVI": (-1.0, 2.5),
+    "SOILM": (-1.0, 1.0),
+    "CHLORO": (-1.0, 10.0),
+}
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class StreamingStats:
+    """
+    Accumulator for summary statistics over a stream of array blocks.
+
+    Quantiles come from a histogram of ``sketch_bins`` equal bins over
+    ``value_range`` with linear interpolation inside the bin, so for
+    quantiles inside the range the error is at most one bin width (0.0005
+    for an NDVI-style [-1, 1] range at the default 4096 bins). Values below
+    or above the range are counted in ``underflow`` / ``overflow`` bins that
+    span out to the observed min / max; quantiles landing there are only
+    interpolated across that span. The reported histogram is the sketch
+    folded down to ``bins`` bins. Two accumulators with the same range and
+    bin counts merge exactly.
+
+    Attributes
+    ----------
+    count : int
+        Number of finite values seen.
+    mean : float
+        Running mean.
+    m2 : float
+        Running sum of squared deviations from the mean.
+    min, max : float
+        Extremes of the finite values seen.
+    underflow, overflow : int
+        Number of values below / above ``value_range``.
+    """
+
+    def __init__(self, value_range=(-1.0, 1.0), bins: int = 64, sketch_bins: int = 4096):
+        if sketch_bins % bins:
+            raise ValueError("sketch_bins must be a multiple of bins")
+        self.value_range = (float(value_range[0]), float(value_range[1]))
+        self.bins = bins
+        self.sketch_bins = sketch_bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = np.zeros(sketch_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @classmethod
+    def for_index(cls, name: str, **kwargs):
+        """Create an accumulator with the histogram range registered for ``name``."""
+        return cls(INDEX_RANGES.get(name.upper(), (-1.0, 1.0)), **kwargs)
+
+    # ------------------------------------------------------------------
+    # ACCUMULATION
+    # ------------------------------------------------------------------
+    def update(self, block):
+        """
+        Add a block of values. NaN and inf values are ignored.
+
+        Parameters
+        ----------
+        block : numpy.ndarray
+            Any-shaped array of values.
+        """
+        values = np.asarray(block).ravel()
+        values = values[np.isfinite(values)]
+        n = values.size
+        if not n:
+            return
+
+        block_mean = float(values.mean())
+        block_m2 = float(np.square(values - block_mean).sum())
+        self._combine(n, block_mean, block_m2, float(values.min()), float(values.max()))
+
+        lo, hi = self.value_range
+        inside = (values >= lo) & (values <= hi)
+        n_inside = int(np.count_nonzero(inside))
+        if n_inside < n:
+            below = int(np.count_nonzero(values < lo))
+            self.underflow += below
+            self.overflow += n - n_inside - below
+            values = values[inside]
+        idx = ((values - lo) * (self.sketch_bins / (hi - lo))).astype(np.int64)
+        # Only values exactly at ``hi`` land past the last bin
+        np.minimum(idx, self.sketch_bins - 1, out=idx)
+        self.sketch += np.bincount(idx, minlength=self.sketch_bins)
+
+    def merge(self, other: "StreamingStats"):
+        """
+        Fold another accumulator (e.g. from a different worker) into this one.
+
+        Parameters
+        ----------
+        other : StreamingStats
+            Accumulator with the same range and bin configuration.
+
+        Returns
+        -------
+        StreamingStats
+            ``self``, for chaining.
+        """
+        if (other.value_range, other.sketch_bins) != (self.value_range, self.sketch_bins):
+            raise ValueError("Cannot merge StreamingStats with different binning")
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch += other.sketch
+            self.underflow += other.underflow
+            self.overflow += other.overflow
+        return self
+
+    def _combine(self, n, mean, m2, vmin, vmax):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    # ------------------------------------------------------------------
+    # RESULTS
+    # ------------------------------------------------------------------
+    @property
+    def variance(self):
+        """Population variance (matches ``np.nanvar``)."""
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        """Population standard deviation (matches ``np.nanstd``)."""
+        return float(np.sqrt(self.variance))
+
+    def histogram(self):
+        """
+        Fixed-bin histogram of the values seen inside ``value_range``.
+
+        Values outside the range are in ``underflow`` / ``overflow``.
+
+        Returns
+        -------
+        tuple
+            (counts, edges) as with ``np.histogram``.
+        """
+        counts = self.sketch.reshape(self.bins, -1).sum(axis=1)
+        edges = np.linspace(self.value_range[0], self.value_range[1], self.bins + 1)
+        return counts, edges
+
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """
+        Approximate quantiles from the histogram sketch.
+
+        Parameters
+        ----------
+        qs : iterable of float
+            Quantiles in [0, 1].
+
+        Returns
+        -------
+        numpy.ndarray
+            Estimated values, clamped to the observed min/max.
+        """
+        qs = np.asarray(qs, dtype=float)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+
+        # Sketch bins plus an underflow bin [min, lo] and overflow bin [hi, max]
+        lo, hi = self.value_range
+        counts = np.concatenate(([self.underflow], self.sketch, [self.overflow]))
+        edges = np.concatenate(([min(lo, self.min)], np.linspace(lo, hi, self.sketch_bins + 1), [max(hi, self.max)]))
+        cum = np.cumsum(counts)
+        targets = qs * self.count
+        idx = np.searchsorted(cum, targets, side="left").clip(0, counts.size - 1)
+        below = np.where(idx > 0, cum[idx - 1], 0)
+        frac = (targets - below) / np.maximum(counts[idx], 1)
+        est = edges[idx] + frac * (edges[idx + 1] - edges[idx])
+        return np.clip(est, self.min, self.max)
+
+    def summary(self, qs=DEFAULT_QUANTILES):
+        """
+        Flat dict of all scalar statistics.
+
+        Returns
+        -------
+        dict
+            count, mean, std, min, max, below/above-range counts and
+            ``pXX`` quantile entries.
+        """
+        out = {
+            "count": self.count,
+            "mean": self.mean if self.count else np.nan,
+            "std": self.std,
+            "min": self.min if self.count else np.nan,
+            "max": self.max if self.count else np.nan,
+            "below_range": self.underflow,
+            "above_range": self.overflow,
+        }
+        for q, v in zip(qs, self.quantiles(qs)):
+            out[f"p{int(round(q * 100)):02d}"] = float(v)
+        return out
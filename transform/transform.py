@@ -7,12 +7,131 @@ Handles:
 """
 
 import os
+import re
+import glob
+from contextlib import ExitStack
 import numpy as np
 import rasterio
 from rasterio.mask import mask
 import geopandas as gpd
-from ..utils.config import PROCESSED_DATA_DIR
+import xarray as xr
+from ..utils.config import PROCESSED_DATA_DIR, REMOTE_GDAL_OPTIONS
 from ..utils.logging import setup_logger
+from ..utils.governor import get_governor, estimate_bytes, array_bytes
+from .stats import StreamingStats
+from .zonal import rasterize_labels, zonal_table
+from .gridcache import TileGridCache, aoi_hash, tile_id_from_name
+
+
+INDEX_NAMES = ("NDVI", "EVI", "CHLORO", "SOILM")
+REQUIRED_BANDS = ("B2", "B4", "B5", "B8", "B11")
+# Row-sized float32 arrays alive per block: 5 band copies, 4 results, ~3 temporaries
+BLOCK_ARRAYS = 12
+# Crop-sized float32 temporaries of the bilinear resample
+RESAMPLE_ARRAYS = 4
+
+# Sentinel-2 L1C/L2A digital numbers: reflectance = DN * scale + offset.
+# Products from processing baseline 04.00 on also carry a -1000 DN offset.
+REFLECTANCE_SCALE = 1e-4
+_QUANTIFICATION_RE = re.compile(r"<(?:BOA_)?QUANTIFICATION_VALUE[^>]*>\s*([\d.]+)\s*<")
+_ADD_OFFSET_RE = re.compile(r"<(?:BOA|RADIO)_ADD_OFFSET[^>]*>\s*(-?[\d.]+)\s*<")
+
+# ERA5 files from the new CDS/WEkEO backend use "valid_time"
+_ERA5_DIMS = {"valid_time": "time", "lat": "latitude", "lon": "longitude"}
+
+# L1C: "..._B04.jp2"; L2A: "..._B04_10m.jp2"
+_BAND_RE = re.compile(r"_B(\d{2}|8A)(?:_(\d{2})M)?\.JP2$")
+
+
+def find_bands(folder: str):
+    """
+    Locate the finest-resolution JP2 file for each required band.
+
+    Parameters
+    ----------
+    folder : str
+        Extracted SAFE product folder.
+
+    Returns
+    -------
+    dict
+        Band name ("B2", "B4", ...) -> file path.
+    """
+    found = {}
+    for root, _, files in os.walk(folder):
+        for f in files:
+            match = _BAND_RE.search(f.upper())
+            if not match:
+                continue
+            name = "B" + match.group(1).lstrip("0")
+            res = int(match.group(2) or 0)
+            if name in REQUIRED_BANDS and (name not in found or res < found[name][0]):
+                found[name] = (res, os.path.join(root, f))
+    return {name: path for name, (_, path) in found.items()}
+
+
+def reflectance_params(folder: str):
+    """
+    Reflectance scale and offset of a SAFE product, from its MTD_MSIL*.xml.
+
+    Parameters
+    ----------
+    folder : str
+        Extracted SAFE product folder.
+
+    Returns
+    -------
+    tuple
+        (scale, offset) with reflectance = DN * scale + offset; the plain
+        1e-4 scaling when the metadata file is missing.
+    """
+    # The product metadata sits at the SAFE root, which may be one level down
+    candidates = [os.path.join(d, name) for d in (folder, *glob.glob(os.path.join(folder, "*.SAFE")))
+                  for name in ("MTD_MSIL2A.xml", "MTD_MSIL1C.xml")]
+    for path in candidates:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+        quantification = _QUANTIFICATION_RE.search(text)
+        offset = _ADD_OFFSET_RE.search(text)
+        scale = 1.0 / float(quantification.group(1)) if quantification else REFLECTANCE_SCALE
+        return scale, float(offset.group(1)) * scale if offset else 0.0
+    return REFLECTANCE_SCALE, 0.0
+
+
+def area_mean_temperature(path: str, bbox):
+    """
+    AOI-mean 2 m temperature series of one ERA5 cube, in °C.
+
+    Parameters
+    ----------
+    path : str
+        ERA5 NetCDF file.
+    bbox : array-like
+        [minx, miny, maxx, maxy] in EPSG:4326.
+
+    Returns
+    -------
+    xarray.DataArray or None
+        Series indexed by ``time``, or None if the cube has no 2 m temperature.
+    """
+    with xr.open_dataset(path) as ds:
+        ds = ds.rename({k: v for k, v in _ERA5_DIMS.items() if k in ds.dims or k in ds.coords})
+        if "t2m" not in ds:
+            return None
+        t2m = ds["t2m"].sortby("time")
+        kelvin = t2m.attrs.get("units", "K") == "K"
+        lat = ds["latitude"]
+        lat_slice = slice(bbox[3], bbox[1]) if lat[0] > lat[-1] else slice(bbox[1], bbox[3])
+        cells = t2m.sel(latitude=lat_slice, longitude=slice(bbox[0], bbox[2]))
+        if cells.sizes["latitude"] == 0 or cells.sizes["longitude"] == 0:
+            # AOI smaller than a grid cell: use the nearest cell
+            series = t2m.sel(latitude=(bbox[1] + bbox[3]) / 2, longitude=(bbox[0] + bbox[2]) / 2, method="nearest")
+        else:
+            series = cells.mean(dim=("latitude", "longitude"))
+        series = series.load()
+    return series - 273.15 if kelvin else series
 
 
 class Transform:
@@ -23,17 +142,31 @@ class Transform:
     --------
     transform_sentinel2(folder, aoi):
         Compute vegetation and soil indices.
+    transform_remote(product, aoi):
+        Compute indices from remote bands (AOI window only).
+    read_bands(band_map, aoi, tile_id):
+        Read AOI windows of each band onto the 10 m grid (cached geometry).
+    compute_indices(bands, scale, offset):
+        Block-wise index computation with streaming summaries.
+    zonal_statistics(indices, aoi, transform=None, crs=None):
+        Per-feature index statistics over a rasterized label grid.
     transform_temperature(file, aoi):
-        Compute average temperature over AOI.
+        Compute temperature statistics over AOI, overall and per day.
     """
 
-    def __init__(self):
+    def __init__(self, block_rows: int = 512):
         self.logger = setup_logger("transform")
+        self.block_rows = block_rows
+        self.summaries = {}
+        self.profile = None
+        self.temperature_daily = {}
+        self.grid_cache = TileGridCache(os.path.join(PROCESSED_DATA_DIR, "grid_cache"))
+        self.governor = get_governor()
 
     # ------------------------------------------------------------------
     # SENTINEL-2 TRANSFORMATION
     # ------------------------------------------------------------------
-    def transform_sentinel2(self, folder: str, aoi: gpd.GeoDataFrame):
+    def transform_sentinel2(self, folder: str, aoi: gpd.GeoDataFrame, charge_outputs: bool = False):
         """
         Compute NDVI, EVI, and soil moisture indices from Sentinel-2 imagery.
 
@@ -43,6 +176,11 @@ class Transform:
             Folder path containing Sentinel-2 bands.
         aoi : geopandas.GeoDataFrame
             AOI polygon to clip data to.
+        charge_outputs : bool
+            Keep the index arrays charged to the memory governor after
+            returning. The caller must then release ``array_bytes(indices)``
+            (e.g. ``loader.submit(..., reserved=array_bytes(indices))``);
+            by default all memory is released on return.
 
         Returns
         -------
@@ -55,51 +193,311 @@ class Transform:
             self.logger.warning("No Sentinel-2 folder found. Skipping.")
             return None
 
-        # Placeholder logic for demonstration
-        ndvi = np.random.rand(100, 100)
-        evi = np.random.rand(100, 100)
-        soilm = np.random.rand(100, 100)
+        band_map = find_bands(folder)
+        missing = [b for b in REQUIRED_BANDS if b not in band_map]
+        if missing:
+            self.logger.warning(f"Missing bands {missing} in {folder}. Skipping.")
+            return None
 
-        indices = {
-            "NDVI": ndvi,
-            "EVI": evi,
-            "SOILM": soilm,
-        }
+        bands, reserved = self.read_bands(band_map, aoi, tile_id_from_name(folder))
+        indices = self._indices(bands, reserved, *reflectance_params(folder), charge_outputs=charge_outputs)
 
         self.logger.info("✅ Sentinel-2 indices computed successfully")
         return indices
 
+    def transform_remote(self, product: dict, aoi: gpd.GeoDataFrame, charge_outputs: bool = False):
+        """
+        Compute indices from remote bands, reading only the AOI window.
+
+        Parameters
+        ----------
+        product : dict
+            Output of ``Extract.get_sentinel2_windows``.
+        aoi : geopandas.GeoDataFrame
+            AOI polygon to clip data to.
+        charge_outputs : bool
+            As in :meth:`transform_sentinel2`.
+
+        Returns
+        -------
+        dict
+            Dictionary containing computed index arrays.
+        """
+        self.logger.info("Transforming remote Sentinel-2 imagery...")
+
+        if not product or not product.get("bands"):
+            self.logger.warning("No remote Sentinel-2 product. Skipping.")
+            return None
+
+        with rasterio.Env(**REMOTE_GDAL_OPTIONS):
+            bands, reserved = self.read_bands(product["bands"], aoi, product.get("tile_id"))
+        scale, offset = product.get("reflectance") or (REFLECTANCE_SCALE, 0.0)
+        indices = self._indices(bands, reserved, scale, offset, charge_outputs=charge_outputs)
+
+        self.logger.info("✅ Sentinel-2 indices computed successfully")
+        return indices
+
+    def _indices(self, bands: dict, reserved: int, scale: float, offset: float, charge_outputs: bool = False):
+        """Compute indices inside the ``reserved`` bytes admitted by ``read_bands``."""
+        try:
+            indices = self.compute_indices(bands, scale, offset)
+        except BaseException:
+            self.governor.release(reserved)
+            raise
+        if not charge_outputs:
+            self.governor.release(reserved)
+            return indices
+        # Opt-in: the index arrays stay charged until the caller (normally
+        # the writer saving them) releases them
+        out_bytes = array_bytes(indices)
+        self.governor.release(reserved - out_bytes)
+        self.governor.detach(out_bytes)
+        return indices
+
+    def read_bands(self, band_map: dict, aoi: gpd.GeoDataFrame, tile_id: str = None):
+        """
+        Read the AOI window of each band onto the 10 m B4 grid.
+
+        Crop windows, AOI masks and resampling gathers come from
+        ``self.grid_cache``, so repeat dates of the same tile skip the
+        reprojection, rasterization and warp setup. Pixels outside the AOI are
+        set to NaN. The output grid is kept in ``self.profile``.
+
+        The whole working set of the task (output bands, index arrays, the
+        largest read buffer and one full block of ``compute_indices``) is
+        admitted from the governor in a single acquire before anything is
+        read, so the task never waits while holding memory; the per-window
+        and per-block reservations borrow from it. The admitted amount is
+        returned for the caller to release.
+
+        Parameters
+        ----------
+        band_map : dict
+            Band name -> local path (see :func:`find_bands`) or GDAL URL.
+        aoi : geopandas.GeoDataFrame
+            AOI polygons.
+        tile_id : str, optional
+            MGRS tile ID used as cache key; grids are not persisted without it.
+
+        Returns
+        -------
+        tuple
+            (bands, reserved): band name -> float32 array on the reference
+            crop, and the bytes admitted from the governor.
+        """
+        aoi_key = aoi_hash(aoi)
+        bands = {}
+        with rasterio.open(band_map["B4"]) as ref, ExitStack() as stack:
+            sources = {name: stack.enter_context(rasterio.open(path)) for name, path in band_map.items()}
+            grids = {name: self.grid_cache.get(tile_id, ref, src, aoi, aoi_key) for name, src in sources.items()}
+            grid = grids["B4"]
+            read_bytes = {name: self._read_bytes(grids[name], src) for name, src in sources.items()}
+
+            row_bytes = estimate_bytes((grid.shape[1],), np.float32, bands=BLOCK_ARRAYS)
+            reserved = (
+                estimate_bytes(grid.shape, bands=len(band_map) + len(INDEX_NAMES))
+                + max(read_bytes.values())
+                + min(self.block_rows, grid.shape[0]) * row_bytes
+            )
+            self.governor.acquire(reserved)
+            try:
+                for name, src in sources.items():
+                    src_grid = grids[name]
+                    with self.governor.reserve(read_bytes[name]):
+                        arr = src_grid.resample(src.read(1, window=src_grid.src_window))
+                    arr[~src_grid.mask] = np.nan
+                    bands[name] = arr
+            except BaseException:
+                self.governor.release(reserved)
+                raise
+
+            self.profile = {
+                "driver": "GTiff",
+                "crs": ref.crs,
+                "transform": grid.transform,
+                "height": grid.shape[0],
+                "width": grid.shape[1],
+                "count": 1,
+                "dtype": "float32",
+            }
+        return bands, reserved
+
+    @staticmethod
+    def _read_bytes(grid, src):
+        """Raw window, its float32 copy and the resample temporaries."""
+        window_shape = (int(grid.src_window.height), int(grid.src_window.width))
+        nbytes = estimate_bytes(window_shape, src.dtypes[0]) + estimate_bytes(window_shape)
+        if grid.rows is not None:
+            nbytes += estimate_bytes(grid.shape, bands=RESAMPLE_ARRAYS)
+        return nbytes
+
+    def compute_indices(self, bands: dict, scale: float = REFLECTANCE_SCALE, offset: float = 0.0):
+        """
+        Compute NDVI, EVI, CHLORO and SOILM block by block.
+
+        Band digital numbers are converted to reflectance first, which EVI
+        (with its constant terms) and the index histogram ranges assume.
+
+        Each block of rows is written into preallocated output arrays and fed
+        to a :class:`StreamingStats` accumulator while it is still in cache,
+        so summaries are ready without another pass over the full arrays.
+        Results are stored in ``self.summaries``.
+
+        Block height is at most ``block_rows`` and shrinks to whatever the
+        memory governor has free when the block starts.
+
+        Parameters
+        ----------
+        bands : dict
+            Band arrays (B2, B4, B5, B8, B11) on a common grid.
+        scale, offset : float
+            Reflectance = DN * scale + offset (see :func:`reflectance_params`).
+
+        Returns
+        -------
+        dict
+            Dictionary containing computed index arrays.
+        """
+        shape = bands["B4"].shape
+        indices = {name: np.empty(shape, dtype=np.float32) for name in INDEX_NAMES}
+        self.summaries = {name: StreamingStats.for_index(name) for name in INDEX_NAMES}
+
+        # Output arrays are part of the read_bands admission; only the
+        # per-block working set (band copies, results, temporaries) is
+        # reserved here, borrowing from that admission when there is one.
+        row_bytes = estimate_bytes((shape[1],), np.float32, bands=BLOCK_ARRAYS)
+
+        start = 0
+        while start < shape[0]:
+            n_rows = self.governor.block_rows(row_bytes, self.block_rows)
+            rows = slice(start, start + n_rows)
+            with self.governor.reserve(n_rows * row_bytes):
+                b2, b4, b5, b8, b11 = (bands[b][rows].astype(np.float32) for b in ("B2", "B4", "B5", "B8", "B11"))
+                for b in (b2, b4, b5, b8, b11):
+                    b *= scale
+                    b += offset
+                block = {
+                    "NDVI": (b8 - b4) / (b8 + b4 + 1e-6),
+                    "EVI": 2.5 * (b8 - b4) / (b8 + 6 * b4 - 7.5 * b2 + 1),
+                    "CHLORO": (b5 / (b4 + 1e-6)) - 1,
+                    "SOILM": (b11 - b8) / (b11 + b8 + 1e-6),
+                }
+                for name, values in block.items():
+                    indices[name][rows] = values
+                    self.summaries[name].update(values)
+            start += n_rows
+
+        return indices
+
+    # ------------------------------------------------------------------
+    # ZONAL STATISTICS
+    # ------------------------------------------------------------------
+    def zonal_statistics(self, indices: dict, aoi: gpd.GeoDataFrame, transform=None, crs=None,
+                         id_column: str = None):
+        """
+        Compute per-feature statistics of every index.
+
+        Feature IDs are rasterized once onto the index grid and all
+        reductions are vectorized over that label grid, so this scales to
+        tens of thousands of parcels without per-polygon masking.
+
+        Parameters
+        ----------
+        indices : dict
+            Index arrays on the 10 m reference grid.
+        aoi : geopandas.GeoDataFrame
+            Feature polygons (fields, parcels...).
+        transform : affine.Affine, optional
+            Geotransform of the index grid; defaults to ``self.profile``.
+        crs : rasterio.crs.CRS, optional
+            CRS of the index grid; defaults to ``self.profile``.
+        id_column : str, optional
+            Column holding feature identifiers; defaults to the AOI index.
+
+        Returns
+        -------
+        pandas.DataFrame or None
+            One row per feature with ``<INDEX>_<stat>`` columns.
+        """
+        if not indices or aoi is None or aoi.empty:
+            self.logger.warning("No indices or AOI features for zonal statistics. Skipping.")
+            return None
+
+        if transform is None or crs is None:
+            if self.profile is None:
+                self.logger.warning("No index grid known for zonal statistics. Skipping.")
+                return None
+            transform = self.profile["transform"] if transform is None else transform
+            crs = self.profile["crs"] if crs is None else crs
+
+        self.logger.info(f"Computing zonal statistics for {len(aoi)} features...")
+        shape = next(iter(indices.values())).shape
+        labels = rasterize_labels(aoi, shape, transform, crs)
+        feature_ids = aoi[id_column].tolist() if id_column else aoi.index.tolist()
+        table = zonal_table(labels, indices, feature_ids)
+
+        self.logger.info("✅ Zonal statistics computed successfully")
+        return table
+
     # ------------------------------------------------------------------
     # TEMPERATURE TRANSFORMATION
     # ------------------------------------------------------------------
-    def transform_temperature(self, temp_file: str, aoi: gpd.GeoDataFrame):
+    def transform_temperature(self, temp_file, aoi: gpd.GeoDataFrame):
         """
         Compute summary temperature statistics for AOI.
 
+        The AOI-mean 2 m temperature of every cube is also reduced per day
+        into ``self.temperature_daily`` (date -> mean/min/max), which the
+        anomaly stage folds into its climatology. Dates present in several
+        cubes are counted once.
+
         Parameters
         ----------
-        temp_file : str
-            Path to ERA5 temperature NetCDF file.
+        temp_file : str or list
+            Path (or list of paths, one per monthly cube) to ERA5 NetCDF data.
         aoi : geopandas.GeoDataFrame
             AOI polygon.
 
         Returns
         -------
         dict
-            Dictionary containing mean, min, and max temperatures.
+            Dictionary containing mean, min, and max temperatures (°C).
         """
         self.logger.info("Transforming ERA5 temperature data...")
+        self.temperature_daily = {}
 
-        if not temp_file or not os.path.exists(temp_file):
+        temp_files = [temp_file] if isinstance(temp_file, str) else list(temp_file or [])
+        if not temp_files or not all(os.path.exists(f) for f in temp_files):
             self.logger.warning("Temperature file missing. Skipping transformation.")
             return None
 
-        # Placeholder logic
+        bbox = aoi.to_crs("EPSG:4326").total_bounds
+        daily = {}
+        for path in temp_files:
+            series = area_mean_temperature(path, bbox)
+            if series is None:
+                self.logger.warning(f"No 2 m temperature in {os.path.basename(path)}. Skipping.")
+                continue
+            days = series.resample(time="1D")
+            means, lows, highs = days.mean(), days.min(), days.max()
+            for day, mean, low, high in zip(means["time"].values, means.values, lows.values, highs.values):
+                if np.isfinite(mean):
+                    daily[str(day)[:10]] = {
+                        "mean_temp": round(float(mean), 2),
+                        "min_temp": round(float(low), 2),
+                        "max_temp": round(float(high), 2),
+                    }
+
+        if not daily:
+            self.logger.warning("No temperature values over the AOI. Skipping transformation.")
+            return None
+        self.temperature_daily = dict(sorted(daily.items()))
+
         stats = {
-            "mean_temp": 27.4,
-            "min_temp": 21.8,
-            "max_temp": 33.2
+            "mean_temp": round(float(np.mean([d["mean_temp"] for d in daily.values()])), 2),
+            "min_temp": min(d["min_temp"] for d in daily.values()),
+            "max_temp": max(d["max_temp"] for d in daily.values()),
         }
 
-        self.logger.info("✅ Temperature statistics computed successfully")
-        return stat
\ No newline at end of file
+        self.logger.info(f"✅ Temperature statistics computed for {len(daily)} days")
+        return stats
@@ -16,3 +16,18 @@ WEKEO_PASSWORD = os.getvenv("WEKEO_PASSWORD", "AChia672083022@")
 
 START_DATE = os.getenv("START_DATE", "2024-01-01T00:00:00Z")
 END_DATE = os.getenv("END_DATE", "2024-12-31T23:59:59Z")
+
+MEMORY_BUDGET = os.getenv("MEMORY_BUDGET")  # e.g. "8G"; default is 70% of available RAM
+
+STAC_API_URL = os.getenv("STAC_API_URL", "https://earth-search.aws.element84.com/v1")
+
+# GDAL tuning for remote range reads: no directory listings, merged/multi-range
+# requests, and a block cache so overlapping windows are not refetched.
+REMOTE_GDAL_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif,.tiff,.jp2",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIRANGE": "YES",
+    "GDAL_HTTP_MAX_RETRY": "3",
+    "VSI_CACHE": "TRUE",
+}
@@ -0,0 +1,244 @@
+"""
+Memory-budget governor shared by all pipeline stages.
+
+Tasks declare (or estimate) how much memory they need and acquire it from
+one global budget before running. Tasks that do not fit wait until others
+release memory; block-wise work can instead ask how many rows currently fit
+and shrink its blocks.
+
+A task admits its whole working set in one ``acquire`` so it never waits
+while holding memory. Nested requests from the same thread (per-window or
+per-block reservations) then borrow from what the thread already holds and
+return immediately. Memory for results handed to another thread (e.g. a
+background writer) is ``detach``-ed and released by that thread later.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+from .config import MEMORY_BUDGET
+
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value):
+    """
+    Parse a byte size such as ``"4G"``, ``"512M"`` or ``"1048576"``.
+
+    Returns
+    -------
+    int or None
+        Bytes, or None for an empty value.
+    """
+    if value is None or str(value).strip() == "":
+        return None
+    value = str(value).strip().upper().rstrip("B")
+    if value[-1] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(float(value))
+
+
+def available_memory():
+    """Currently available physical memory in bytes (best effort)."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return 2 * _UNITS["G"]
+
+
+def estimate_bytes(shape, dtype=np.float32, bands: int = 1, overhead: float = 1.0):
+    """
+    Memory needed for ``bands`` arrays of ``shape`` and ``dtype``.
+
+    Parameters
+    ----------
+    shape : tuple
+        Array shape, e.g. (10980, 10980) for a full 10 m scene.
+    dtype : numpy dtype
+        Element type.
+    bands : int
+        Number of such arrays held at once.
+    overhead : float
+        Multiplier for temporaries.
+
+    Returns
+    -------
+    int
+    """
+    return int(np.prod(shape) * np.dtype(dtype).itemsize * bands * overhead)
+
+
+def array_bytes(arrays):
+    """Total ``nbytes`` of a dict or list of arrays (0 for None)."""
+    if not arrays:
+        return 0
+    values = arrays.values() if isinstance(arrays, dict) else arrays
+    return int(sum(arr.nbytes for arr in values))
+
+
+class MemoryGovernor:
+    """
+    Admission control against a global RAM budget.
+
+    Attributes
+    ----------
+    budget : int
+        Total bytes that may be reserved at once.
+    in_use : int
+        Bytes currently reserved.
+    peak : int
+        Highest ``in_use`` seen.
+    detached : int
+        Bytes handed off by their acquiring thread, not yet released.
+    """
+
+    def __init__(self, budget: int = None):
+        self.budget = budget or int(available_memory() * 0.7)
+        self.in_use = 0
+        self.peak = 0
+        self.detached = 0
+        self._held = {}
+        self._lent = {}
+        self._cond = threading.Condition()
+
+    @property
+    def free(self):
+        return self.budget - self.in_use
+
+    @property
+    def slack(self):
+        """Bytes the calling thread holds but has not lent to nested requests."""
+        me = threading.get_ident()
+        with self._cond:
+            return self._held.get(me, 0) - self._lent.get(me, 0)
+
+    def acquire(self, nbytes: int, timeout: float = None):
+        """
+        Reserve ``nbytes``, waiting until they fit in the budget.
+
+        If the calling thread already holds enough unlent memory, the
+        request borrows from it and never waits. Otherwise it waits for the
+        budget; a request that cannot fit at all is still admitted once the
+        calling thread is the only holder (e.g. larger than the whole
+        budget), so it runs alone instead of waiting forever.
+
+        Tasks should admit their peak working set up front: a thread that
+        waits here while holding memory can block other holders.
+
+        Returns
+        -------
+        bool
+            False if ``timeout`` expired before the memory was available.
+        """
+        nbytes = int(nbytes)
+        me = threading.get_ident()
+        with self._cond:
+            lent = self._lent.get(me, 0)
+            if self._held.get(me, 0) - lent >= nbytes:
+                self._lent[me] = lent + nbytes
+                return True
+            fits = lambda: self.in_use + nbytes <= self.budget or self.in_use == self._held.get(me, 0)
+            if not self._cond.wait_for(fits, timeout):
+                return False
+            self.in_use += nbytes
+            self._held[me] = self._held.get(me, 0) + nbytes
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def release(self, nbytes: int):
+        """
+        Return ``nbytes`` and wake waiting tasks.
+
+        Borrowed memory goes back to the calling thread's own reservation
+        first; beyond what the thread holds, detached memory is released.
+        """
+        nbytes = int(nbytes)
+        me = threading.get_ident()
+        with self._cond:
+            lent = self._lent.get(me, 0)
+            repaid = min(lent, nbytes)
+            self._set(self._lent, me, lent - repaid)
+            nbytes -= repaid
+            if nbytes:
+                held = self._held.get(me, 0)
+                own = min(held, nbytes)
+                self._set(self._held, me, held - own)
+                self.detached = max(self.detached - (nbytes - own), 0)
+                self.in_use = max(self.in_use - nbytes, 0)
+                self._cond.notify_all()
+
+    def detach(self, nbytes: int):
+        """
+        Hand ``nbytes`` of the calling thread's memory off to another thread.
+
+        The bytes stay charged against the budget until some thread calls
+        :meth:`release` for them (e.g. a writer once the data is saved).
+        """
+        nbytes = int(nbytes)
+        me = threading.get_ident()
+        with self._cond:
+            self._set(self._held, me, self._held.get(me, 0) - nbytes)
+            self.detached += nbytes
+
+    @staticmethod
+    def _set(counts: dict, key, value: int):
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+
+    @contextmanager
+    def reserve(self, nbytes: int):
+        """Context manager around :meth:`acquire`/:meth:`release`."""
+        self.acquire(nbytes)
+        try:
+            yield nbytes
+        finally:
+            self.release(nbytes)
+
+    def block_rows(self, row_bytes: int, max_rows: int, min_rows: int = 16):
+        """
+        Largest block height (in rows) that fits in the free budget now,
+        or in the calling thread's own unlent reservation if that is larger.
+
+        Parameters
+        ----------
+        row_bytes : int
+            Working-set bytes per row of a block.
+        max_rows : int
+            Preferred block height.
+        min_rows : int
+            Smallest block worth processing; callers then wait in
+            :meth:`acquire` instead of shrinking further.
+
+        Returns
+        -------
+        int
+        """
+        me = threading.get_ident()
+        with self._cond:
+            slack = self._held.get(me, 0) - self._lent.get(me, 0)
+            fit = max(self.free, slack) // max(int(row_bytes), 1)
+        return int(max(min(max_rows, fit), min(min_rows, max_rows)))
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_governor():
+    """Process-wide governor, created on first use from ``MEMORY_BUDGET``."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MemoryGovernor(parse_size(MEMORY_BUDGET))
+        return _governor